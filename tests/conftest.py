@@ -1,5 +1,7 @@
 import os
 
+import pytest
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 root_dir_content = os.listdir(BASE_DIR)
 PROJECT_DIR_NAME = 'yatube'
@@ -37,3 +39,21 @@ pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Кэш сбрасывают сигналы после фиксации транзакции, а тест её
+    # откатывает: страницы одного теста не должны достаться другому.
+    from django.core.cache import cache
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    # Картинки и миниатюры из mixer не должны оседать в yatube/media.
+    # Пул режет миниатюры в фоне: его ждут, пока MEDIA_ROOT подменён.
+    from posts.thumbnails import wait
+    settings.MEDIA_ROOT = str(tmp_path)
+    yield
+    wait()
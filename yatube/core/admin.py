@@ -0,0 +1,26 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'subject', 'recipients', 'status', 'attempts', 'next_attempt'
+    )
+    list_filter = ('status',)
+    search_fields = ('subject', 'recipients')
+    exclude = ('message',)
+    readonly_fields = ('last_error',)
+    actions = ['retry']
+
+    def retry(self, request, queryset):
+        """Возвращает неотправленные письма в очередь."""
+        queryset.update(
+            status=QueuedEmail.PENDING, attempts=0,
+            next_attempt=timezone.now(), locked_at=None, locked_by=''
+        )
+    retry.short_description = 'Отправить заново'
+
+
+admin.site.register(QueuedEmail, QueuedEmailAdmin)
@@ -0,0 +1,46 @@
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+
+LOCK_ERRORS = ('database is locked', 'database table is locked')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Обработчик connection_created: PRAGMA из SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_lock_error(error):
+    return any(message in str(error) for message in LOCK_ERRORS)
+
+
+def retry_on_lock(func):
+    """
+    Выполняет запись в транзакции и повторяет её, пока база занята.
+
+    busy_timeout не спасает транзакцию, которая начала с чтения: в режиме
+    WAL SQLite сразу отказывает ей в записи, если писатель уже есть. Тогда
+    вся транзакция повторяется после паузы, растущей вдвое с каждой
+    попыткой, но не более SQLITE_WRITE_RETRIES раз.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        delay = settings.SQLITE_RETRY_DELAY
+        for attempt in range(settings.SQLITE_WRITE_RETRIES + 1):
+            try:
+                with transaction.atomic():
+                    return func(*args, **kwargs)
+            except OperationalError as error:
+                if (not is_lock_error(error)
+                        or attempt == settings.SQLITE_WRITE_RETRIES):
+                    raise
+            time.sleep(delay * random.uniform(0.5, 1.5))
+            delay *= 2
+    return wrapper
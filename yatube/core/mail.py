@@ -0,0 +1,69 @@
+from email import message_from_bytes
+from email.message import Message
+
+from django.core.mail import EmailMessage
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import MIMEMixin
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+
+class ParsedMessage(MIMEMixin, Message):
+    """MIME из очереди, который бэкенды почты сериализуют как свой."""
+
+
+class StoredEmailMessage(EmailMessage):
+    """
+    Письмо из очереди: отправляется готовым MIME, без повторной сборки.
+
+    Очередь хранит только байты письма, отправителя и получателей,
+    поэтому из таблицы не загружается ничего, кроме данных.
+    """
+
+    def __init__(self, raw, subject, from_email, recipients):
+        super().__init__(subject, from_email=from_email, to=recipients)
+        self.raw = bytes(raw)
+
+    def message(self):
+        return message_from_bytes(self.raw, _class=ParsedMessage)
+
+
+def queued_email(message):
+    return QueuedEmail(
+        message=message.message().as_bytes(),
+        subject=message.subject[:255],
+        from_email=message.from_email,
+        recipients='\n'.join(message.recipients()),
+        next_attempt=timezone.now(),
+    )
+
+
+def stored_message(email):
+    """Собирает письмо для отправки из записи очереди."""
+    return StoredEmailMessage(
+        email.message, email.subject, email.from_email,
+        email.recipients.splitlines()
+    )
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Сохраняет письма в очередь и сразу возвращает управление.
+
+    Отправляет их команда send_queued_mail через MAIL_QUEUE_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        messages = [
+            message for message in email_messages if message.recipients()
+        ]
+        try:
+            QueuedEmail.objects.bulk_create(
+                queued_email(message) for message in messages
+            )
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+        return len(messages)
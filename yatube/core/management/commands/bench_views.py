@@ -0,0 +1,205 @@
+import json
+import random
+import time
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from faker import Faker
+from mixer.backend.django import mixer
+
+from posts.models import Group, Post
+
+User = get_user_model()
+BATCH_SIZE = 5000
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Засевает временную тестовую базу и замеряет задержку, число '
+        'запросов к БД и пропускную способность публичных страниц.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш перед каждым запросом.'
+        )
+        parser.add_argument('--output', help='Файл для результатов в JSON.')
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        self.mirror_replicas()
+        try:
+            self.seed(options['users'], options['groups'], options['posts'])
+            results = {
+                name: self.measure(client, url, options)
+                for name, client, url in self.routes()
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        report = {
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'seed': {
+                key: options[key] for key in ('users', 'groups', 'posts')
+            },
+            'requests': options['requests'],
+            'cold': options['cold'],
+            'results': results,
+        }
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<30} ' + ' '.join(
+                    f'p{percent}={result[f"p{percent}_ms"]:.2f}мс'
+                    for percent in PERCENTILES
+                ) + f' запросов={result["queries"]:.1f}'
+                f' rps={result["rps"]:.0f}'
+                f' статусы={result["statuses"]}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        # Быстрый ответ 429 или 500 — не результат замера, а ошибка.
+        failed = [
+            name for name, result in results.items()
+            if set(result['statuses']) != {200}
+        ]
+        if failed:
+            raise CommandError(
+                'Не все ответы 200: ' + ', '.join(failed)
+            )
+
+    def mirror_replicas(self):
+        """Реплики смотрят в ту же временную базу, как TEST MIRROR в тестах."""
+        for alias in connections:
+            if alias != connection.alias:
+                connections[alias].close()
+                connections[alias].settings_dict['NAME'] = (
+                    connection.settings_dict['NAME']
+                )
+
+    def seed(self, users, groups, posts):
+        fake = Faker('ru_RU')
+        mixer.cycle(users).blend(
+            User, username=(f'bench_{i}' for i in range(users)),
+            first_name=mixer.FAKE, last_name=mixer.FAKE,
+        )
+        mixer.cycle(groups).blend(
+            Group, slug=(f'bench-{i}' for i in range(groups))
+        )
+        author_ids = list(User.objects.values_list('pk', flat=True))
+        group_ids = list(Group.objects.values_list('pk', flat=True)) + [None]
+        for offset in range(0, posts, BATCH_SIZE):
+            Post.objects.bulk_create(
+                Post(
+                    text=fake.text(),
+                    author_id=random.choice(author_ids),
+                    group_id=random.choice(group_ids),
+                )
+                for _ in range(min(BATCH_SIZE, posts - offset))
+            )
+        # bulk_create обходит сигналы и save(): выравниваем счётчики,
+        # ленты и готовую разметку.
+        call_command('recount_posts', stdout=self.stdout)
+        call_command('rebuild_timelines', stdout=self.stdout)
+        call_command('render_posts', stdout=self.stdout)
+
+    def routes(self):
+        guest = Client()
+        author = Client()
+        user = User.objects.order_by('pk').first()
+        author.force_login(user)
+        post = Post.objects.filter(author=user).first() or Post.objects.first()
+        group = Group.objects.order_by('pk').first()
+        return [
+            ('posts:index', guest, reverse('posts:index')),
+            ('posts:index?page=2', guest, reverse('posts:index') + '?page=2'),
+            ('posts:group_list', guest,
+             reverse('posts:group_list', args=[group.slug])),
+            ('posts:profile', guest,
+             reverse('posts:profile', args=[user.username])),
+            ('posts:post_detail', guest,
+             reverse('posts:post_detail', args=[post.pk])),
+            ('posts:search', guest, reverse('posts:search') + '?q=текст'),
+            ('posts:index_rss', guest, reverse('posts:index_rss')),
+            ('posts:index_atom', guest, reverse('posts:index_atom')),
+            ('posts:group_rss', guest,
+             reverse('posts:group_rss', args=[group.slug])),
+            ('posts:group_atom', guest,
+             reverse('posts:group_atom', args=[group.slug])),
+            ('posts:profile_rss', guest,
+             reverse('posts:profile_rss', args=[user.username])),
+            ('posts:profile_atom', guest,
+             reverse('posts:profile_atom', args=[user.username])),
+            ('posts:api_post_list', guest, reverse('posts:api_post_list')),
+            ('posts:api_post_detail', guest,
+             reverse('posts:api_post_detail', args=[post.pk])),
+            ('posts:api_group_list', guest,
+             reverse('posts:api_group_list', args=[group.slug])),
+            ('posts:api_profile', guest,
+             reverse('posts:api_profile', args=[user.username])),
+            ('posts:post_create', author, reverse('posts:post_create')),
+            ('posts:post_edit', author,
+             reverse('posts:post_edit', args=[post.pk])),
+            ('about:author', guest, reverse('about:author')),
+            ('about:tech', guest, reverse('about:tech')),
+            ('users:login', guest, reverse('users:login')),
+            ('users:signup', guest, reverse('users:signup')),
+            ('users:password_reset', guest, reverse('users:password_reset')),
+            ('users:password_reset_done', guest,
+             reverse('users:password_reset_done')),
+            ('users:password_reset_complete', guest,
+             reverse('users:password_reset_complete')),
+            ('users:password_change', author,
+             reverse('users:password_change')),
+            ('users:password_change_done', author,
+             reverse('users:password_change_done')),
+            # Выход — отдельным клиентом: author должен остаться в сессии.
+            ('users:logout', Client(), reverse('users:logout')),
+        ]
+
+    def measure(self, client, url, options):
+        timings = []
+        queries = 0
+        statuses = {}
+        started = time.perf_counter()
+        for _ in range(options['requests']):
+            if options['cold']:
+                cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                request_started = time.perf_counter()
+                status = client.get(url).status_code
+                timings.append(
+                    (time.perf_counter() - request_started) * 1000
+                )
+            queries += len(context)
+            statuses[status] = statuses.get(status, 0) + 1
+        elapsed = time.perf_counter() - started
+        result = {
+            f'p{percent}_ms': percentile(timings, percent)
+            for percent in PERCENTILES
+        }
+        result['queries'] = queries / len(timings)
+        result['rps'] = len(timings) / elapsed
+        result['statuses'] = statuses
+        return result
@@ -0,0 +1,112 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+
+from core.db import is_lock_error, retry_on_lock
+from core.management.commands.bench_views import PERCENTILES, percentile
+from posts.models import Post
+
+User = get_user_model()
+# baseline — SQLite как до core.db: журнал отката, без PRAGMA и повторов.
+MODES = ('baseline', 'tuned')
+
+
+def write_posts(mode, author_id, count):
+    """Пишет посты в дочернем процессе; возвращает задержки и ошибки."""
+    if mode == 'baseline':
+        settings.SQLITE_PRAGMAS = {}
+    save = (lambda post: post.save()) if mode == 'baseline' else (
+        lambda post: retry_on_lock(post.save)()
+    )
+    timings = []
+    errors = 0
+    for number in range(count):
+        post = Post(text=f'Пост {os.getpid()} {number}', author_id=author_id)
+        started = time.perf_counter()
+        try:
+            save(post)
+        except OperationalError as error:
+            if not is_lock_error(error):
+                raise
+            errors += 1
+            continue
+        timings.append((time.perf_counter() - started) * 1000)
+    connections.close_all()
+    return timings, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет одновременную запись постов из нескольких процессов '
+        'в файловую SQLite: без настроек и с WAL, PRAGMA и повторами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8)
+        parser.add_argument(
+            '--posts', type=int, default=200,
+            help='Постов на каждый процесс.'
+        )
+        parser.add_argument('--output', help='Файл для результатов в JSON.')
+
+    def handle(self, *args, **options):
+        results = {mode: self.measure(mode, options) for mode in MODES}
+        for mode, result in results.items():
+            self.stdout.write(
+                f'{mode:<10} ' + ' '.join(
+                    f'p{percent}={result[f"p{percent}_ms"]:.2f}мс'
+                    for percent in PERCENTILES
+                ) + f' записей/с={result["writes_per_second"]:.0f}'
+                f' ошибок={result["errors"]}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'started': datetime.now().isoformat(timespec='seconds'),
+                    'processes': options['processes'],
+                    'posts': options['posts'],
+                    'results': results,
+                }, file, ensure_ascii=False, indent=2)
+
+    def measure(self, mode, options):
+        test_settings = connection.settings_dict['TEST']
+        test_name = test_settings.get('NAME')
+        with tempfile.TemporaryDirectory() as directory:
+            # Запись в память не показывает ни блокировок, ни fsync.
+            test_settings['NAME'] = os.path.join(directory, f'{mode}.db')
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                author = User.objects.create_user(username='bench_writer')
+                if mode == 'baseline':
+                    with connection.cursor() as cursor:
+                        cursor.execute('PRAGMA journal_mode = DELETE')
+                # Дочерние процессы не должны делить соединение родителя.
+                connections.close_all()
+                started = time.perf_counter()
+                with multiprocessing.get_context('fork').Pool(
+                        options['processes']) as pool:
+                    chunks = pool.starmap(write_posts, [
+                        (mode, author.pk, options['posts'])
+                    ] * options['processes'])
+                elapsed = time.perf_counter() - started
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                test_settings['NAME'] = test_name
+        timings = [timing for chunk, _ in chunks for timing in chunk]
+        result = {
+            f'p{percent}_ms': percentile(timings, percent) if timings else 0
+            for percent in PERCENTILES
+        }
+        result['writes_per_second'] = len(timings) / elapsed
+        result['errors'] = sum(errors for _, errors in chunks)
+        return result
@@ -0,0 +1,115 @@
+import time
+import uuid
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from core.mail import stored_message
+from core.models import QueuedEmail
+
+
+def reopen(connection):
+    connection.close()
+    try:
+        connection.open()
+    except OSError:
+        # Не открылось: send_messages попробует открыть его сам.
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пачками через одно соединение '
+        'MAIL_QUEUE_BACKEND. Неудачные повторяет с растущей паузой, после '
+        'MAIL_QUEUE_RETRIES попыток помечает как неотправленные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать новых писем.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между проверками очереди в режиме --loop, секунды.'
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection(settings.MAIL_QUEUE_BACKEND)
+        connection.open()
+        try:
+            while True:
+                sent, failed = self.drain(connection, options['batch_size'])
+                if sent or failed:
+                    self.stdout.write(
+                        f'Отправлено: {sent}, с ошибкой: {failed}'
+                    )
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            connection.close()
+
+    def claim(self, batch_size):
+        """
+        Забирает пачку писем себе и возвращает её.
+
+        UPDATE с условием «не взято» атомарен: письмо, которое успел
+        взять другой воркер, сюда не попадёт и не уйдёт дважды.
+        """
+        now = timezone.now()
+        free = QueuedEmail.objects.filter(
+            Q(locked_at__isnull=True) | Q(locked_at__lt=now - timedelta(
+                seconds=settings.MAIL_QUEUE_LOCK_TIMEOUT
+            )),
+            status=QueuedEmail.PENDING, next_attempt__lte=now,
+        )
+        token = uuid.uuid4().hex
+        free.filter(
+            pk__in=list(free.values_list('pk', flat=True)[:batch_size])
+        ).update(locked_at=now, locked_by=token)
+        return list(QueuedEmail.objects.filter(locked_by=token))
+
+    def drain(self, connection, batch_size):
+        sent = failed = 0
+        while True:
+            emails = self.claim(batch_size)
+            sent_ids = []
+            for email in emails:
+                try:
+                    connection.send_messages([stored_message(email)])
+                except Exception as error:
+                    if isinstance(error, SMTPServerDisconnected):
+                        # Сервер оборвал соединение: остальным нужно новое.
+                        reopen(connection)
+                    self.fail(email, error)
+                    failed += 1
+                    continue
+                sent_ids.append(email.pk)
+            QueuedEmail.objects.filter(pk__in=sent_ids).delete()
+            sent += len(sent_ids)
+            if len(emails) < batch_size:
+                return sent, failed
+
+    def fail(self, email, error):
+        email.attempts += 1
+        email.last_error = f'{type(error).__name__}: {error}'
+        if email.attempts >= settings.MAIL_QUEUE_RETRIES:
+            email.status = QueuedEmail.DEAD
+        else:
+            email.next_attempt = timezone.now() + timedelta(
+                seconds=settings.MAIL_QUEUE_RETRY_DELAY
+                * 2 ** (email.attempts - 1)
+            )
+        email.locked_at = None
+        email.locked_by = ''
+        email.save(update_fields=[
+            'attempts', 'last_error', 'status', 'next_attempt', 'locked_at',
+            'locked_by'
+        ])
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import Template
+
+from .routers import primary_pinned, set_replica_reads
+
+logger = logging.getLogger('yatube.timing')
+SAFE_METHODS = ('GET', 'HEAD')
+PIN_COOKIE = 'primary_pin'
+_local = threading.local()
+
+
+class RequestTimings:
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_time += time.perf_counter() - started
+
+
+def timed_render(render):
+    def wrapper(self, *args, **kwargs):
+        timings = getattr(_local, 'timings', None)
+        if timings is None:
+            return render(self, *args, **kwargs)
+        # Вложенные render_to_string уже учтены во внешнем шаблоне.
+        timings.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            timings.template_depth -= 1
+            if not timings.template_depth:
+                timings.template_time += time.perf_counter() - started
+    wrapper.timed = True
+    return wrapper
+
+
+class ServerTimingMiddleware:
+    """
+    Замеряет запросы к БД, отрисовку шаблонов и весь запрос.
+
+    Итог уходит в заголовок Server-Timing и в лог yatube.timing с именем
+    маршрута. При SERVER_TIMING = False Django исключает middleware целиком.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVER_TIMING', False):
+            raise MiddlewareNotUsed
+        if not getattr(Template.render, 'timed', False):
+            Template.render = timed_render(Template.render)
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = _local.timings = RequestTimings()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            _local.timings = None
+        total = (time.perf_counter() - started) * 1000
+        sql = timings.sql_time * 1000
+        template = timings.template_time * 1000
+        response['Server-Timing'] = (
+            f'db;dur={sql:.2f};desc="{timings.sql_count} queries", '
+            f'tpl;dur={template:.2f}, total;dur={total:.2f}'
+        )
+        match = request.resolver_match
+        view_name = match.view_name if match else '-'
+        logger.info(
+            'view=%s method=%s status=%s sql_count=%d sql_ms=%.2f '
+            'template_ms=%.2f total_ms=%.2f',
+            view_name, request.method, response.status_code,
+            timings.sql_count, sql, template, total,
+            extra={
+                'view_name': view_name,
+                'sql_count': timings.sql_count,
+                'sql_ms': sql,
+                'template_ms': template,
+                'total_ms': total,
+            }
+        )
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Пускает чтение страниц из REPLICA_VIEWS на реплику.
+
+    После записи (любого не-GET запроса) ставит куку, и ещё
+    REPLICA_PIN_SECONDS пользователь читает из основной базы, чтобы
+    видеть свои изменения, пока реплика отстаёт. Столько же после любого
+    сброса кэша страниц (pin_primary) из основной базы читают запросы,
+    которые наполняют общие кэши.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            set_replica_reads(False)
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax'
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        set_replica_reads(
+            request.method in SAFE_METHODS
+            and PIN_COOKIE not in request.COOKIES
+            and view_name in settings.REPLICA_VIEWS
+            and not (
+                self.fills_shared_cache(request, view_name)
+                and primary_pinned()
+            )
+        )
+
+    def fills_shared_cache(self, request, view_name):
+        """Страницы анонимов и RSS/Atom кэшируются для всех читателей."""
+        return (
+            not request.user.is_authenticated
+            or view_name in settings.SHARED_CACHE_VIEWS
+        )
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.BinaryField(verbose_name='Письмо')),
+                ('subject', models.CharField(max_length=255, verbose_name='Тема')),
+                ('recipients', models.TextField(verbose_name='Получатели')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает отправки'), ('dead', 'Не отправлено')], default='pending', max_length=10, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Поставлено в очередь')),
+                ('next_attempt', models.DateTimeField(verbose_name='Следующая попытка')),
+            ],
+            options={
+                'verbose_name': 'Письмо в очереди',
+                'verbose_name_plural': 'Очередь писем',
+                'ordering': ('pk',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='queuedemail',
+            index=models.Index(fields=['status', 'next_attempt'], name='email_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queuedemail',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Взято воркером'),
+        ),
+        migrations.AddField(
+            model_name='queuedemail',
+            name='locked_by',
+            field=models.CharField(blank=True, editable=False, max_length=32, verbose_name='Воркер'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:07
+
+from django.db import migrations, models
+
+# Старая очередь хранила pickle, а его загрузка исполняет код: такие
+# письма не разбираются, а помечаются неотправленными.
+PICKLE_PROTOCOL = b'\x80'
+LEGACY_ERROR = (
+    'Письмо в старом формате: отправьте очередь до миграции core 0003.'
+)
+
+
+def reject_pickled(apps, schema_editor):
+    model = apps.get_model('core', 'QueuedEmail')
+    legacy = [
+        pk for pk, message in model.objects.values_list(
+            'pk', 'message'
+        ).iterator()
+        if bytes(message[:1]) == PICKLE_PROTOCOL
+    ]
+    model.objects.filter(pk__in=legacy).update(
+        status='dead', last_error=LEGACY_ERROR, locked_at=None, locked_by=''
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_queued_email_lock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queuedemail',
+            name='from_email',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Отправитель'),
+        ),
+        migrations.AlterField(
+            model_name='queuedemail',
+            name='message',
+            field=models.BinaryField(verbose_name='Письмо в формате MIME'),
+        ),
+        migrations.AlterField(
+            model_name='queuedemail',
+            name='recipients',
+            field=models.TextField(help_text='По одному адресу в строке.', verbose_name='Получатели'),
+        ),
+        migrations.RunPython(reject_pickled, migrations.RunPython.noop),
+    ]
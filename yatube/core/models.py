@@ -0,0 +1,52 @@
+from django.db import models
+
+
+class QueuedEmail(models.Model):
+    """Письмо, которое ждёт отправки командой send_queued_mail."""
+
+    PENDING = 'pending'
+    DEAD = 'dead'
+    STATUSES = [
+        (PENDING, 'Ожидает отправки'),
+        (DEAD, 'Не отправлено'),
+    ]
+
+    message = models.BinaryField(verbose_name='Письмо в формате MIME')
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    from_email = models.CharField(
+        max_length=255, blank=True, verbose_name='Отправитель'
+    )
+    recipients = models.TextField(
+        verbose_name='Получатели', help_text='По одному адресу в строке.'
+    )
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name='Поставлено в очередь'
+    )
+    next_attempt = models.DateTimeField(verbose_name='Следующая попытка')
+    locked_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Взято воркером'
+    )
+    locked_by = models.CharField(
+        max_length=32, blank=True, editable=False, verbose_name='Воркер'
+    )
+
+    class Meta:
+        ordering = ('pk',)
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt'], name='email_queue_idx'
+            ),
+        ]
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+
+    def __str__(self):
+        return self.subject
@@ -0,0 +1,119 @@
+import math
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+LOCK_TIMEOUT = 1
+# Сколько ждать корзину, занятую параллельным запросом, и шаг опроса.
+LOCK_WAIT = 0.05
+LOCK_POLL = 0.005
+
+
+def parse_rate(rate):
+    """'10/m' -> (ёмкость 10, пополнение в секунду 10 / 60)."""
+    count, period = rate.split('/')
+    return int(count), int(count) / PERIODS[period]
+
+
+def bucket_keys(request, scope):
+    """Корзины запроса: по пользователю и по IP, как задано в RATE_LIMITS."""
+    limits = settings.RATE_LIMITS.get(scope, {})
+    idents = {'ip': request.META.get('REMOTE_ADDR')}
+    if request.user.is_authenticated:
+        idents['user'] = request.user.pk
+    return {
+        f'ratelimit:{scope}:{kind}:{idents[kind]}': parse_rate(rate)
+        for kind, rate in limits.items() if idents.get(kind) is not None
+    }
+
+
+@contextmanager
+def locked(keys):
+    """
+    Берёт блокировки корзин keys; отдаёт False, если не дождался.
+
+    Блокировки берутся в одном порядке, поэтому запросы с общими
+    корзинами не ждут друг друга по кругу.
+    """
+    held = []
+    try:
+        for key in sorted(keys):
+            lock = f'{key}:lock'
+            deadline = time.monotonic() + LOCK_WAIT
+            while not cache.add(lock, True, LOCK_TIMEOUT):
+                if time.monotonic() > deadline:
+                    yield False
+                    return
+                time.sleep(LOCK_POLL)
+            held.append(lock)
+        yield True
+    finally:
+        cache.delete_many(held)
+
+
+def take_token(request, scope):
+    """
+    Забирает по жетону из каждой корзины запроса.
+
+    Возвращает 0 или, если какая-то корзина пуста, сколько секунд ждать;
+    тогда жетоны не списываются. Состояние корзин — (жетоны, время) в кэше:
+    одно чтение на все корзины и по записи на каждую. Чтение и запись идут
+    под блокировкой корзин, иначе параллельные запросы списали бы один
+    и тот же жетон.
+    """
+    buckets = bucket_keys(request, scope)
+    if not buckets:
+        return 0
+    with locked(buckets) as acquired:
+        if not acquired:
+            # Корзину долго держит параллельный запрос того же клиента.
+            return LOCK_WAIT
+        now = time.time()
+        states = cache.get_many(buckets)
+        tokens = {}
+        wait = 0
+        for key, (capacity, rate) in buckets.items():
+            left, updated = states.get(key, (capacity, now))
+            left = min(capacity, left + (now - updated) * rate)
+            if left < 1:
+                wait = max(wait, (1 - left) / rate)
+            tokens[key] = left
+        if wait:
+            return wait
+        for key, (capacity, rate) in buckets.items():
+            # Полная корзина не хранится: по истечении ключа она снова полна.
+            cache.set(
+                key, (tokens[key] - 1, now), math.ceil(capacity / rate)
+            )
+        return 0
+
+
+def rate_limit(scope):
+    """
+    Ограничивает частоту записей token bucket'ом из RATE_LIMITS[scope].
+
+    GET и HEAD кэш не трогают; на лишний запрос отвечает 429
+    с Retry-After.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method in SAFE_METHODS:
+                return view(request, *args, **kwargs)
+            wait = take_token(request, scope)
+            if wait:
+                response = HttpResponse(
+                    'Слишком много запросов, попробуйте позже.',
+                    status=429, content_type='text/plain; charset=utf-8'
+                )
+                response['Retry-After'] = str(math.ceil(wait))
+                return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
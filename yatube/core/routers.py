@@ -0,0 +1,70 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+DEFAULT = 'default'
+REPLICA = 'replica'
+PIN_KEY = 'replica:pinned'
+
+_local = threading.local()
+
+
+def set_replica_reads(enabled):
+    """Включает чтение с реплики для текущего потока."""
+    _local.replica_reads = enabled
+
+
+def replica_reads_enabled():
+    return getattr(_local, 'replica_reads', False)
+
+
+def pin_primary():
+    """
+    После записи: ещё REPLICA_PIN_SECONDS страницы для общих кэшей читаются
+    из основной базы.
+
+    Иначе страница, собранная по отстающей реплике сразу после сброса
+    кэша, легла бы в кэш со старым содержимым на весь его срок.
+    """
+    cache.set(PIN_KEY, True, settings.REPLICA_PIN_SECONDS)
+
+
+def primary_pinned():
+    return cache.get(PIN_KEY) is not None
+
+
+def replica_available():
+    # Реплика с тем же файлом, что и основная база (в тестах — зеркало
+    # TEST MIRROR), не разгружает её, а транзакцию TestCase не видит.
+    return (
+        REPLICA in connections.databases
+        and connections[REPLICA].settings_dict['NAME']
+        != connections[DEFAULT].settings_dict['NAME']
+    )
+
+
+class ReplicaRouter:
+    """
+    Читает с реплики, только если это разрешил ReplicaMiddleware.
+
+    Записи, транзакции и всё, что вне списка REPLICA_VIEWS, идут в основную
+    базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (replica_reads_enabled() and replica_available()
+                and not connections[DEFAULT].in_atomic_block):
+            return REPLICA
+        return DEFAULT
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика — копия основной базы, связи между ними допустимы.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT
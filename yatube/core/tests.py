@@ -0,0 +1,404 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections
+from django.http import HttpResponse
+from django.test import (
+    Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from core import routers
+from core.db import retry_on_lock
+from core.models import QueuedEmail
+from core.ratelimit import take_token
+from posts.cache import purge_pages
+from posts.models import Post
+from core.middleware import (
+    PIN_COOKIE, ReplicaMiddleware, ServerTimingMiddleware
+)
+
+User = get_user_model()
+
+INDEX_URL = reverse('posts:index')
+CREATE_POST_URL = reverse('posts:post_create')
+PASSWORD_RESET_URL = reverse('users:password_reset')
+SIGNUP_URL = reverse('users:signup')
+EMAIL = 'user@example.com'
+BCC_EMAIL = 'bcc@example.com'
+USERNAME = 'UserAuthor'
+LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+@override_settings(SERVER_TIMING=True)
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_server_timing_header(self):
+        with self.assertLogs('yatube.timing', 'INFO'):
+            response = self.guest_client.get(INDEX_URL + '?cursor=')
+        timing = response['Server-Timing']
+        for metric in ['db;dur=', 'queries"', 'tpl;dur=', 'total;dur=']:
+            with self.subTest(metric=metric):
+                self.assertIn(metric, timing)
+
+    def test_timing_is_logged_with_view_name(self):
+        with self.assertLogs('yatube.timing', 'INFO') as logs:
+            self.guest_client.get(reverse('about:author'))
+        self.assertIn('view=about:author', logs.output[0])
+        self.assertIn('sql_count=0', logs.output[0])
+
+    @override_settings(SERVER_TIMING=False)
+    def test_disabled_middleware_is_not_used(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ServerTimingMiddleware(lambda request: None)
+
+
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.router = routers.ReplicaRouter()
+        self.addCleanup(routers.set_replica_reads, False)
+
+    def reads_replica(self, request):
+        """Включил ли middleware чтение с реплики на время запроса."""
+        seen = []
+
+        def view(request):
+            seen.append(routers.replica_reads_enabled())
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(view)
+        request.resolver_match = resolve(request.path)
+        if not hasattr(request, 'user'):
+            request.user = AnonymousUser()
+        middleware.process_view(request, view, (), {})
+        response = middleware(request)
+        self.assertFalse(routers.replica_reads_enabled())
+        return seen[0], response
+
+    def test_feed_reads_go_to_replica(self):
+        reads, _ = self.reads_replica(self.factory.get(INDEX_URL))
+        self.assertTrue(reads)
+
+    def test_forms_and_writes_stay_on_primary(self):
+        for request in [
+            self.factory.get(CREATE_POST_URL),
+            self.factory.post(INDEX_URL),
+        ]:
+            with self.subTest(request=request):
+                reads, _ = self.reads_replica(request)
+                self.assertFalse(reads)
+
+    def test_write_pins_user_to_primary(self):
+        _, response = self.reads_replica(self.factory.post(CREATE_POST_URL))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        request = self.factory.get(INDEX_URL)
+        request.COOKIES[PIN_COOKIE] = '1'
+        reads, _ = self.reads_replica(request)
+        self.assertFalse(reads)
+
+    def test_router(self):
+        self.assertEqual(self.router.db_for_write(User), routers.DEFAULT)
+        self.assertEqual(self.router.db_for_read(User), routers.DEFAULT)
+        routers.set_replica_reads(True)
+        with mock.patch('core.routers.replica_available', return_value=True):
+            # TestCase держит открытую транзакцию: читаем в ней из default.
+            self.assertEqual(self.router.db_for_read(User), routers.DEFAULT)
+            with mock.patch.object(
+                    routers.connections[routers.DEFAULT], 'in_atomic_block',
+                    False):
+                self.assertEqual(
+                    self.router.db_for_read(User), routers.REPLICA
+                )
+        self.assertFalse(self.router.allow_migrate(routers.REPLICA, 'posts'))
+
+    def test_mirror_replica_is_not_used(self):
+        self.assertFalse(routers.replica_available())
+
+    def test_purge_pins_anonymous_reads_to_primary(self):
+        purge_pages('index')
+        reads, _ = self.reads_replica(self.factory.get(INDEX_URL))
+        self.assertFalse(reads)
+        request = self.factory.get(INDEX_URL)
+        request.user = User(username='reader')
+        reads, _ = self.reads_replica(request)
+        self.assertTrue(reads)
+
+
+class LaggingReplicaTests(TransactionTestCase):
+    """Реплика — отдельный файл SQLite со снимком базы, который отстаёт."""
+
+    databases = {routers.DEFAULT, routers.REPLICA}
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username=USERNAME)
+        Post.objects.create(text='Старый пост', author=self.author)
+        replica = connections[routers.REPLICA]
+        self.addCleanup(replica.close)
+        self.addCleanup(
+            replica.settings_dict.__setitem__, 'NAME',
+            replica.settings_dict['NAME']
+        )
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        replica.close()
+        replica.settings_dict['NAME'] = os.path.join(directory, 'replica.db')
+        target = sqlite3.connect(replica.settings_dict['NAME'])
+        connection.ensure_connection()
+        connection.connection.backup(target)
+        target.close()
+        self.guest = Client()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def profile_texts(self, client):
+        response = client.get(reverse('posts:profile', args=[USERNAME]))
+        return [post.text for post in response.context['page_obj']]
+
+    def test_reads_lag_until_pin_expires(self):
+        self.client.post(CREATE_POST_URL, data={'text': 'Новый пост'})
+        # Сразу после записи: автор по куке, аноним — после сброса кэша.
+        self.assertIn('Новый пост', self.profile_texts(self.client))
+        self.assertIn('Новый пост', self.profile_texts(self.guest))
+        # Закрепление истекло, кэш страниц пуст.
+        cache.clear()
+        self.assertIn('Новый пост', self.profile_texts(self.client))
+        # Без куки и закрепления чтение идёт с отстающей реплики.
+        self.assertEqual(self.profile_texts(self.guest), ['Старый пост'])
+
+
+class SqliteConnectionTests(TestCase):
+    def test_pragmas_are_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(
+                cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout']
+            )
+
+    @mock.patch('core.db.time.sleep')
+    def test_retry_on_lock(self, sleep):
+        write = mock.Mock(side_effect=[
+            OperationalError('database is locked'),
+            OperationalError('database is locked'),
+            'saved',
+        ])
+        self.assertEqual(retry_on_lock(write)(), 'saved')
+        self.assertEqual(write.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    @mock.patch('core.db.time.sleep')
+    @override_settings(SQLITE_WRITE_RETRIES=2)
+    def test_retry_gives_up(self, sleep):
+        write = mock.Mock(side_effect=OperationalError('database is locked'))
+        with self.assertRaises(OperationalError):
+            retry_on_lock(write)()
+        self.assertEqual(write.call_count, 3)
+
+    def test_other_errors_are_not_retried(self):
+        write = mock.Mock(side_effect=OperationalError('no such table'))
+        with self.assertRaises(OperationalError):
+            retry_on_lock(write)()
+        self.assertEqual(write.call_count, 1)
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    MAIL_QUEUE_BACKEND=LOCMEM_BACKEND,
+    MAIL_QUEUE_RETRIES=2,
+)
+class MailQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User.objects.create_user(
+            username='user', email=EMAIL, password='password'
+        )
+
+    def send_queued_mail(self):
+        call_command('send_queued_mail', stdout=StringIO())
+
+    def test_password_reset_is_queued_and_sent(self):
+        Client().post(PASSWORD_RESET_URL, {'email': EMAIL})
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(QueuedEmail.objects.get().recipients, EMAIL)
+        self.send_queued_mail()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [EMAIL])
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_queue_stores_mime_without_pickle(self):
+        mail.EmailMessage(
+            'Subject', 'Текст', 'from@example.com', [EMAIL],
+            bcc=[BCC_EMAIL]
+        ).send()
+        email = QueuedEmail.objects.get()
+        self.assertTrue(bytes(email.message).startswith(b'Content-Type:'))
+        self.assertEqual(email.from_email, 'from@example.com')
+        self.assertEqual(email.recipients.splitlines(), [EMAIL, BCC_EMAIL])
+        with mock.patch('pickle.loads') as loads:
+            self.send_queued_mail()
+        loads.assert_not_called()
+        sent = mail.outbox[0]
+        self.assertEqual(sent.from_email, 'from@example.com')
+        self.assertEqual(sent.recipients(), [EMAIL, BCC_EMAIL])
+        message = sent.message()
+        self.assertEqual(message['Subject'], 'Subject')
+        self.assertIsNone(message['Bcc'])
+        self.assertEqual(
+            message.get_payload(decode=True).decode(), 'Текст'
+        )
+
+    def test_failed_mail_is_retried_then_dead(self):
+        mail.send_mail('Тема', 'Текст', None, [EMAIL])
+        with mock.patch(
+                'django.core.mail.backends.locmem.EmailBackend.send_messages',
+                side_effect=OSError('connection refused')):
+            self.send_queued_mail()
+            email = QueuedEmail.objects.get()
+            self.assertEqual(email.attempts, 1)
+            self.assertEqual(email.status, QueuedEmail.PENDING)
+            self.assertIn('connection refused', email.last_error)
+            # Повтор ещё не наступил: письмо не берётся.
+            self.send_queued_mail()
+            self.assertEqual(QueuedEmail.objects.get().attempts, 1)
+            QueuedEmail.objects.update(next_attempt=email.created)
+            self.send_queued_mail()
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.status, QueuedEmail.DEAD)
+        self.send_queued_mail()
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_worker_drains_queue_in_batches(self):
+        for number in range(5):
+            mail.send_mail(f'Тема {number}', 'Текст', None, [EMAIL])
+        call_command(
+            'send_queued_mail', '--batch-size', '2', stdout=StringIO()
+        )
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_mail_claimed_by_other_worker_is_skipped(self):
+        for number in range(2):
+            mail.send_mail(f'Тема {number}', 'Текст', None, [EMAIL])
+        claimed = QueuedEmail.objects.first()
+        QueuedEmail.objects.filter(pk=claimed.pk).update(
+            locked_at=timezone.now(), locked_by='other'
+        )
+        self.send_queued_mail()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(QueuedEmail.objects.get(), claimed)
+        # Воркер упал, не отправив письмо: после таймаута его берёт другой.
+        QueuedEmail.objects.update(locked_at=timezone.now() - timedelta(
+            seconds=settings.MAIL_QUEUE_LOCK_TIMEOUT + 1
+        ))
+        self.send_queued_mail()
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_connection_survives_failed_mail(self):
+        for number in range(3):
+            mail.send_mail(f'Тема {number}', 'Текст', None, [EMAIL])
+        backend = 'django.core.mail.backends.locmem.EmailBackend'
+        with mock.patch(f'{backend}.open') as open_, \
+                mock.patch(f'{backend}.close') as close, \
+                mock.patch(f'{backend}.send_messages', side_effect=[
+                    OSError('mailbox unavailable'), 1, 1
+                ]):
+            self.send_queued_mail()
+        open_.assert_called_once()
+        close.assert_called_once()
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertIsNone(email.locked_at)
+
+
+@override_settings(RATE_LIMITS={
+    'posts': {'user': '2/m', 'ip': '3/m'},
+    'signup': {'ip': '1/h'},
+})
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.user_other = User.objects.create_user(username='other')
+
+    def setUp(self):
+        cache.clear()
+        self.author = Client()
+        self.author.force_login(self.user)
+        self.other = Client()
+        self.other.force_login(self.user_other)
+
+    def create_post(self, client):
+        return client.post(CREATE_POST_URL, {'text': 'Пост'})
+
+    def test_user_limit(self):
+        for _ in range(2):
+            self.assertEqual(self.create_post(self.author).status_code, 302)
+        response = self.create_post(self.author)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(self.create_post(self.other).status_code, 302)
+
+    def test_ip_limit(self):
+        self.create_post(self.author)
+        self.create_post(self.author)
+        self.create_post(self.other)
+        self.assertEqual(self.create_post(self.other).status_code, 429)
+
+    def test_signup_limit(self):
+        for status in [200, 429]:
+            with self.subTest(status=status):
+                self.assertEqual(
+                    Client().post(SIGNUP_URL, {}).status_code, status
+                )
+
+    def test_interleaved_requests_do_not_share_token(self):
+        request = RequestFactory().post(CREATE_POST_URL)
+        request.user = self.user
+        get_many = cache.get_many
+        racing = []
+
+        def read_with_race(keys):
+            # Второй запрос приходит между чтением и записью первого.
+            if not racing:
+                racing.append(None)
+                racing[0] = take_token(request, 'posts')
+            return get_many(keys)
+
+        with mock.patch(
+                'core.ratelimit.cache.get_many', side_effect=read_with_race):
+            self.assertEqual(take_token(request, 'posts'), 0)
+        self.assertGreater(racing[0], 0)
+        self.assertEqual(take_token(request, 'posts'), 0)
+        self.assertGreater(take_token(request, 'posts'), 0)
+        self.assertIsNone(
+            cache.get(f'ratelimit:posts:user:{self.user.pk}:lock')
+        )
+
+    def test_get_does_not_touch_cache(self):
+        self.create_post(self.author)
+        self.create_post(self.author)
+        with mock.patch('core.ratelimit.cache') as limiter_cache:
+            self.assertEqual(
+                self.author.get(CREATE_POST_URL).status_code, 200
+            )
+        limiter_cache.get_many.assert_not_called()
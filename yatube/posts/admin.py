@@ -1,15 +1,203 @@
+import json
+from datetime import date, datetime, time, timedelta
+
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.contenttypes.models import ContentType
+from django.core.paginator import Paginator
+from django.db import models, transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.functional import cached_property
 
+from .cache import posts_count
+from .export import CONTENT_TYPES, export_lines, export_rows
 from .models import Post, Group
+from .search import filter_by_search
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator списка постов без COUNT(*) по всей таблице.
+
+    Без фильтров число постов берётся из кэша (posts_count), с фильтрами
+    считается по индексам, как обычно.
+    """
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            return posts_count()
+        return super().count
+
+
+def next_period(day, kind):
+    if kind == 'year':
+        return date(day.year + 1, 1, 1)
+    if kind == 'month':
+        return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+    return day + timedelta(days=1)
+
+
+class IndexedDatesQuerySet(models.QuerySet):
+    """
+    Посты для списка в админке: dates() без DISTINCT по всей таблице.
+
+    date_hierarchy перечисляет годы, месяцы и дни через dates(). Здесь
+    границы дают MIN и MAX по индексу pub_date, а каждый период
+    проверяется exists() — коротким поиском по тому же индексу.
+    """
+
+    def dates(self, field_name, kind, order='ASC'):
+        bounds = self.aggregate(
+            first=models.Min(field_name), last=models.Max(field_name)
+        )
+        if bounds['first'] is None:
+            return []
+        day = timezone.localtime(bounds['first']).date()
+        last = timezone.localtime(bounds['last']).date()
+        if kind == 'year':
+            day = day.replace(month=1, day=1)
+        elif kind == 'month':
+            day = day.replace(day=1)
+        dates = []
+        while day <= last:
+            following = next_period(day, kind)
+            if self.filter(**{
+                f'{field_name}__gte': timezone.make_aware(
+                    datetime.combine(day, time())
+                ),
+                f'{field_name}__lt': timezone.make_aware(
+                    datetime.combine(following, time())
+                ),
+            }).exists():
+                dates.append(day)
+            day = following
+        return dates if order == 'ASC' else dates[::-1]
+
+
+class LoadedAutocompleteSelect(AutocompleteSelect):
+    """
+    AutocompleteSelect, которому выбранный объект можно передать готовым.
+
+    Обычный виджет достаёт его отдельным запросом, то есть по запросу
+    на каждую строку списка с list_editable.
+    """
+
+    selected_objects = None
+
+    def optgroups(self, name, value, attr=None):
+        if self.selected_objects is None:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        for obj in self.selected_objects:
+            options.append(self.create_option(
+                name, obj.pk, self.choices.field.label_from_instance(obj),
+                True, len(options)
+            ))
+        return [(None, options, 0)]
+
+
+class LoadedChoicesForm(forms.ModelForm):
+    """Строка списка: выбранные группы уже загружены list_select_related."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, field in self.fields.items():
+            widget = getattr(field.widget, 'widget', field.widget)
+            if isinstance(widget, LoadedAutocompleteSelect):
+                related = getattr(self.instance, name, None)
+                widget.selected_objects = [related] if related else []
+
+
+def export_action(file_format):
+    """Действие списка: выгрузка выбранных постов потоком, без буфера."""
+    def action(modeladmin, request, queryset):
+        response = StreamingHttpResponse(
+            export_lines(export_rows(queryset), file_format),
+            content_type=CONTENT_TYPES[file_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="posts.{file_format}"'
+        )
+        return response
+    action.__name__ = f'export_{file_format}'
+    action.short_description = f'Выгрузить в {file_format.upper()}'
+    return action
 
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ("pk", "text", "pub_date", "author", "group")
     list_editable = ("group",)
+    list_select_related = ("author", "group")
+    autocomplete_fields = ("author", "group")
     search_fields = ("text",)
     list_filter = ("pub_date",)
+    date_hierarchy = "pub_date"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = "-пусто-"
+    actions = (export_action('csv'), export_action('jsonl'))
+
+    def get_queryset(self, request):
+        # Как ModelAdmin.get_queryset, но с dates() для date_hierarchy.
+        queryset = IndexedDatesQuerySet(self.model)
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return filter_by_search(queryset, search_term), False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.autocomplete_fields:
+            kwargs['widget'] = LoadedAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using')
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', LoadedChoicesForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method != 'POST' or '_save' not in request.POST:
+            return super().changelist_view(request, extra_context)
+        # Правки list_editable: одна транзакция и одна вставка в журнал
+        # вместо фиксации и записи LogEntry на каждую строку.
+        request.admin_log = []
+        with transaction.atomic():
+            response = super().changelist_view(request, extra_context)
+            LogEntry.objects.bulk_create(request.admin_log)
+        return response
+
+    def log_change(self, request, object, message):
+        if not hasattr(request, 'admin_log'):
+            return super().log_change(request, object, message)
+        request.admin_log.append(LogEntry(
+            user_id=request.user.pk,
+            content_type=ContentType.objects.get_for_model(object),
+            object_id=str(object.pk),
+            object_repr=str(object)[:200],
+            action_flag=CHANGE,
+            change_message=(
+                message if isinstance(message, str) else json.dumps(message)
+            ),
+        ))
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ("title", "slug", "posts_count")
+    search_fields = ("title", "slug")
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
@@ -0,0 +1,102 @@
+import json
+from itertools import chain
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.views.decorators.http import require_GET
+
+from .archive import FEED_ORDER, get_post_or_404
+from .models import Group, Post, User
+from .paginators import CursorPaginator
+from .views import feed
+from yatube.settings import POSTS_ON_PAGE
+
+STREAM_CHUNK_SIZE = 500
+
+
+def post_data(post):
+    return {
+        'id': post.pk,
+        'text': post.text,
+        'pub_date': post.pub_date,
+        'author': post.author.username,
+        'group': post.group.slug if post.group_id else None,
+        'url': reverse('posts:post_detail', args=[post.pk]),
+    }
+
+
+def cursor_url(request, cursor):
+    if cursor is None:
+        return None
+    return f'{request.path}?{urlencode({"cursor": cursor})}'
+
+
+def page_response(request, queryset, archived=None):
+    page = CursorPaginator(
+        feed(queryset), POSTS_ON_PAGE,
+        None if archived is None else feed(archived)
+    ).page(request.GET.get('cursor', ''))
+    return JsonResponse({
+        'results': [post_data(post) for post in page],
+        'next': cursor_url(request, page.next_cursor()),
+        'previous': cursor_url(request, page.previous_cursor()),
+    })
+
+
+def stream_posts(*querysets):
+    """
+    JSON-массив постов по частям: память не растёт с числом постов.
+
+    querysets идут один за другим: горячая таблица, затем архив.
+    """
+    yield '['
+    posts = chain.from_iterable(
+        feed(queryset).order_by(*FEED_ORDER).iterator(
+            chunk_size=STREAM_CHUNK_SIZE
+        )
+        for queryset in querysets
+    )
+    for number, post in enumerate(posts):
+        yield (',' if number else '') + json.dumps(
+            post_data(post), cls=DjangoJSONEncoder, ensure_ascii=False
+        )
+    yield ']'
+
+
+def feed_response(request, queryset, archived):
+    if request.GET.get('all') == '1':
+        return StreamingHttpResponse(
+            stream_posts(queryset, archived), content_type='application/json'
+        )
+    return page_response(request, queryset, archived)
+
+
+@require_GET
+def post_list(request):
+    return page_response(request, Post.objects.all())
+
+
+@require_GET
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(
+        request, group.posts.all(), group.archived_posts.all()
+    )
+
+
+@require_GET
+def profile_posts(request, username):
+    author = get_object_or_404(User, username=username)
+    return feed_response(
+        request, author.posts.all(), author.archived_posts.all()
+    )
+
+
+@require_GET
+def post_detail(request, post_id):
+    return JsonResponse(post_data(
+        get_post_or_404(post_id, 'author', 'group')
+    ))
@@ -0,0 +1,94 @@
+from django.db import transaction
+from django.http import Http404
+
+from .models import ArchivedPost, Post
+
+FEED_ORDER = ('-pub_date', '-pk')
+
+
+def get_post_or_404(post_id, *related):
+    """Пост из posts_post, а если его там уже нет — из архива."""
+    for model in (Post, ArchivedPost):
+        post = model.objects.select_related(*related).filter(
+            pk=post_id
+        ).first()
+        if post is not None:
+            return post
+    raise Http404('Пост не найден')
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Переносит в архив до batch_size самых старых постов раньше cutoff.
+
+    Вставка и удаление идут в одной транзакции: пост не пропадает
+    и не виден дважды. Возвращает число перенесённых постов.
+    """
+    with transaction.atomic():
+        posts = list(
+            Post.objects.filter(pub_date__lt=cutoff).order_by('pk')
+            [:batch_size]
+        )
+        if not posts:
+            return 0
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost.from_post(post) for post in posts
+        )
+        delete_moved(Post.objects.filter(pk__in=[post.pk for post in posts]))
+    return len(posts)
+
+
+def delete_moved(queryset):
+    """
+    Удаляет перенесённые в архив посты одним DELETE, без сигналов.
+
+    QuerySet._raw_delete — закрытый API Django (проверен на 2.2): он не
+    собирает каскад и не шлёт post_delete. Каскадить нечего, на Post
+    не ссылается ни одна модель (это проверяет тест), а сигналы уменьшили
+    бы счётчики автора и группы, хотя пост не удалён, а перенесён.
+    FTS чистят триггеры.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+class ArchiveFeed:
+    """
+    Лента, которая за последним постом posts_post продолжается архивом.
+
+    Пока страница помещается в горячую таблицу, архив не читается.
+    posts — queryset или TimelineFeed, archived — queryset архива; в обоих
+    посты новее идут первыми, а архивные всегда старше горячих.
+    total() — счётчик всех постов ленты вместе с архивом; без него
+    считаются обе таблицы.
+    """
+
+    def __init__(self, posts, archived, total=None):
+        self.posts = posts
+        self.archived = archived
+        self.get_total = total
+
+    @property
+    def queryset(self):
+        # Курсор идёт по горячей таблице, а за ней — по self.archived.
+        return getattr(self.posts, 'queryset', self.posts)
+
+    def count(self):
+        if self.get_total is None:
+            return self.posts.count() + self.archived.count()
+        # Счётчик может отставать: горячих постов не меньше, чем видно.
+        return max(self.posts.count(), self.get_total())
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        rows = list(self.posts[start:index.stop])
+        if len(rows) == index.stop - start:
+            return rows
+        hot_count = start + len(rows) if rows else self.queryset.count()
+        return rows + list(self.archived.order_by(*FEED_ORDER)[
+            max(start - hot_count, 0):index.stop - hot_count
+        ])
@@ -0,0 +1,202 @@
+import hashlib
+import logging
+import threading
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from .models import Group, Post
+from core.routers import pin_primary
+from yatube.settings import PAGE_CACHE_TIMEOUT, POSTS_COUNT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Версия, которую меняют правки, затрагивающие все страницы сразу.
+ALL_PAGES = 'all'
+POSTS_COUNT_KEY = 'count:posts'
+POSTS_COUNT_FRESH_KEY = 'count:posts:fresh'
+
+
+def version_key(kind, pk):
+    return f'version:{kind}:{pk}'
+
+
+def new_version():
+    # Версия, пропавшая из кэша, не должна совпасть ни с одной из прежних.
+    return time.time_ns()
+
+
+def bump_versions(*keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_version(), None)
+
+
+def get_versions(keys):
+    """Читает версии одним обращением к кэшу, заводя недостающие."""
+    versions = cache.get_many(keys)
+    missing = {key: new_version() for key in set(keys) - versions.keys()}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def page_version_key(scope):
+    # Слаги и имена могут содержать пробелы и кириллицу: в ключ — их хэш.
+    return version_key('page', hashlib.md5(scope.encode()).hexdigest())
+
+
+def card_version_keys(post):
+    return (
+        version_key('post', post.pk),
+        version_key('group', post.group_id),
+        version_key('author', post.author_id),
+    )
+
+
+def set_card_versions(posts):
+    """
+    Проставляет постам card_version для ключа кэша карточки.
+
+    Версии поста, группы и автора читаются из кэша одним обращением
+    на страницу.
+    """
+    versions = get_versions(
+        {key for post in posts for key in card_version_keys(post)}
+    )
+    for post in posts:
+        post.card_version = '.'.join(
+            str(versions[key]) for key in card_version_keys(post)
+        )
+    return posts
+
+
+def purge_pages(*scopes):
+    """Сбрасывает кэш страниц ленты: index, group:<slug>, profile:<name>."""
+    bump_versions(*(page_version_key(scope) for scope in scopes))
+    # Реплика может ещё не видеть запись, из-за которой сброшен кэш.
+    pin_primary()
+
+
+def feed_scopes(post, *group_ids):
+    """Ленты, на страницах которых виден пост."""
+    group_slugs = Group.objects.filter(
+        pk__in={pk for pk in group_ids if pk is not None}
+    ).values_list('slug', flat=True)
+    return ['index', f'profile:{post.author.username}'] + [
+        f'group:{slug}' for slug in group_slugs
+    ]
+
+
+def page_tag(request, scope):
+    """Хэш адреса и версий ленты: меняется при каждом purge_pages(scope)."""
+    keys = [page_version_key(ALL_PAGES), page_version_key(scope)]
+    versions = get_versions(keys)
+    return hashlib.md5(' '.join(
+        [request.get_full_path()] + [str(versions[key]) for key in keys]
+    ).encode()).hexdigest()
+
+
+def cache_anonymous_page(scope):
+    """
+    Кэширует страницу для анонимных посетителей.
+
+    scope(**kwargs) называет ленту, к которой относится страница; ключ
+    включает версию ленты, поэтому purge_pages сбрасывает все её страницы.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, **kwargs)
+            key = 'page:' + page_tag(request, scope(**kwargs))
+            response = cache.get(key)
+            if response is None:
+                response = view(request, **kwargs)
+                if response.status_code == 200:
+                    cache.set(key, response, PAGE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
+
+
+def cache_feed(scope):
+    """
+    Кэширует RSS/Atom-ленту для всех читателей и отвечает 304 по ETag.
+
+    ETag — тот же хэш версий, что и ключ кэша, поэтому неизменившаяся
+    лента обходится без обращений к БД.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, **kwargs)
+            tag = page_tag(request, scope(**kwargs))
+            etag = quote_etag(tag)
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                return response
+            key = 'feed:' + tag
+            response = cache.get(key)
+            if response is None:
+                response = view(request, **kwargs)
+                if response.status_code == 200:
+                    response['ETag'] = etag
+                    cache.set(key, response, PAGE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
+
+
+def refresh_posts_count():
+    count = Post.objects.count()
+    cache.set(POSTS_COUNT_KEY, count, None)
+    cache.set(POSTS_COUNT_FRESH_KEY, True, POSTS_COUNT_TIMEOUT)
+    return count
+
+
+def refresh_posts_count_in_background():
+    try:
+        refresh_posts_count()
+    except DatabaseError:
+        logger.exception('Не удалось пересчитать число постов')
+    finally:
+        connection.close()
+
+
+def posts_count():
+    """
+    Число постов для ленты index без COUNT(*) на каждый запрос.
+
+    Значение живёт в кэше и правится сигналами при создании и удалении
+    постов. Раз в POSTS_COUNT_TIMEOUT его пересчитывает фоновый поток,
+    а запрос тем временем получает прежнее число.
+    """
+    count = cache.get(POSTS_COUNT_KEY)
+    if count is None:
+        return refresh_posts_count()
+    if cache.add(POSTS_COUNT_FRESH_KEY, True, POSTS_COUNT_TIMEOUT):
+        threading.Thread(
+            target=refresh_posts_count_in_background, daemon=True
+        ).start()
+    return count
+
+
+def change_posts_count(delta):
+    try:
+        if delta > 0:
+            cache.incr(POSTS_COUNT_KEY, delta)
+        else:
+            cache.decr(POSTS_COUNT_KEY, -delta)
+    except ValueError:
+        # Числа ещё нет в кэше: его посчитает первый запрос ленты.
+        pass
@@ -0,0 +1,104 @@
+import hashlib
+
+from django.db.models import OuterRef, Subquery
+from django.views.decorators.http import condition
+
+from .cache import ALL_PAGES, get_versions, page_version_key, version_key
+from .models import ArchivedPost, Group, Post, User
+
+
+def latest_update(**filters):
+    """Подзапрос с последним updated_at постов; идёт по индексу *_updated."""
+    return Subquery(
+        Post.objects.filter(**filters).order_by('-updated_at')
+        .values('updated_at')[:1]
+    )
+
+
+def post_state(post_id):
+    for model in (Post, ArchivedPost):
+        post = model.objects.filter(pk=post_id).values(
+            'updated_at', 'author_id', 'group_id',
+            'author__stats__posts_count'
+        ).first()
+        if post is not None:
+            break
+    else:
+        return None
+    return {
+        'last_modified': post['updated_at'],
+        # Архивный пост выглядит иначе: без кнопки редактирования.
+        'tag': (model.is_archived, post['author__stats__posts_count']),
+        'keys': [
+            version_key('post', post_id),
+            version_key('author', post['author_id']),
+            version_key('group', post['group_id']),
+        ],
+    }
+
+
+def profile_state(username):
+    author = User.objects.filter(username=username).values(
+        'pk', 'stats__posts_count',
+        last_modified=latest_update(author=OuterRef('pk')),
+    ).first()
+    if author is None:
+        return None
+    return {
+        'last_modified': author['last_modified'],
+        'tag': author['stats__posts_count'],
+        'keys': [
+            version_key('author', author['pk']),
+            page_version_key(ALL_PAGES),
+            page_version_key(f'profile:{username}'),
+        ],
+    }
+
+
+def group_state(slug):
+    group = Group.objects.filter(slug=slug).values(
+        'pk', 'posts_count',
+        last_modified=latest_update(group=OuterRef('pk')),
+    ).first()
+    if group is None:
+        return None
+    return {
+        'last_modified': group['last_modified'],
+        'tag': group['posts_count'],
+        'keys': [
+            version_key('group', group['pk']),
+            page_version_key(ALL_PAGES),
+            page_version_key(f'group:{slug}'),
+        ],
+    }
+
+
+def conditional_page(state):
+    """
+    condition() с ETag из одного дешёвого запроса.
+
+    state(**kwargs) возвращает last_modified, метку tag и ключи версий из
+    кэша, которые меняются вместе с содержимым страницы (например, при
+    переименовании автора). Результат запоминается на время запроса.
+
+    Last-Modified не отдаётся: updated_at поста или max(updated_at) ленты
+    не видит правок автора и группы, а у лент ещё и отступает назад при
+    удалении или переносе поста. Дата входит в ETag вместе с версиями.
+    """
+    def request_state(request, **kwargs):
+        if not hasattr(request, '_page_state'):
+            request._page_state = state(**kwargs)
+        return request._page_state
+
+    def etag(request, **kwargs):
+        page_state = request_state(request, **kwargs)
+        if page_state is None:
+            return None
+        versions = get_versions(page_state['keys'])
+        return hashlib.md5(repr([
+            page_state['last_modified'], page_state['tag'],
+            [versions[key] for key in page_state['keys']],
+            request.user.pk, request.get_full_path(),
+        ]).encode()).hexdigest()
+
+    return condition(etag_func=etag)
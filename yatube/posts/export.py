@@ -0,0 +1,60 @@
+import csv
+import heapq
+import json
+from operator import itemgetter
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+FORMATS = ('jsonl', 'csv')
+FIELDS = ('id', 'text', 'pub_date', 'author', 'group')
+EXPORT_CHUNK_SIZE = 2000
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class Echo:
+    """Файл для csv.writer, который сразу отдаёт записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, after_id=None, chunk_size=EXPORT_CHUNK_SIZE,
+                archived=None):
+    """
+    Строки постов (FIELDS) по возрастанию pk.
+
+    Без моделей и select_related: автор и группа приходят одним JOIN
+    в values_list, а iterator() читает курсором по chunk_size строк.
+    С after_id выгрузка продолжается после последнего выгруженного поста.
+    Строки архива (archived) вливаются по pk: id при переносе сохраняется.
+    """
+    if after_id is not None:
+        queryset = queryset.filter(pk__gt=after_id)
+    rows = queryset.order_by('pk').values_list(
+        'pk', 'text', 'pub_date', 'author__username', 'group__slug'
+    ).iterator(chunk_size=chunk_size)
+    if archived is None:
+        return rows
+    return heapq.merge(
+        rows, export_rows(archived, after_id, chunk_size), key=itemgetter(0)
+    )
+
+
+def export_lines(rows, file_format):
+    """Строки файла выгрузки; поля совпадают с форматом import_posts."""
+    if file_format == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(FIELDS)
+        for row in rows:
+            yield writer.writerow(
+                row[:2] + (row[2].isoformat(),) + row[3:]
+            )
+        return
+    for row in rows:
+        yield json.dumps(
+            dict(zip(FIELDS, row)), cls=DjangoJSONEncoder,
+            ensure_ascii=False
+        ) + '\n'
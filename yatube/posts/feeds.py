@@ -0,0 +1,126 @@
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from .cache import cache_feed
+from .models import Group, Post, User
+from .views import feed
+
+FEED_SIZE = 20
+TITLE_LENGTH = 50
+
+
+class PostsFeed(Feed):
+    """Последние посты ленты в RSS 2.0; наследники задают ленту."""
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return feed(self.posts(obj)).order_by('-pub_date', '-pk')[:FEED_SIZE]
+
+    def item_title(self, post):
+        return Truncator(post.text).chars(TITLE_LENGTH)
+
+    def item_description(self, post):
+        return post.text
+
+    def item_link(self, post):
+        return reverse('posts:post_detail', args=[post.pk])
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.updated_at
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+    def item_categories(self, post):
+        return [post.group.title] if post.group_id else []
+
+
+class IndexFeed(PostsFeed):
+    title = 'Yatube: последние обновления'
+    description = 'Новые посты на сайте'
+
+    def link(self):
+        return reverse('posts:index')
+
+
+class GroupFeed(PostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def posts(self, group):
+        return group.posts.all()
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('posts:group_list', args=[group.slug])
+
+
+class AuthorFeed(PostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def posts(self, author):
+        return author.posts.all()
+
+    def title(self, author):
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def description(self, author):
+        return f'Посты пользователя {author.username}'
+
+    def link(self, author):
+        return reverse('posts:profile', args=[author.username])
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class IndexAtomFeed(AtomFeedMixin, IndexFeed):
+    pass
+
+
+class GroupAtomFeed(AtomFeedMixin, GroupFeed):
+    pass
+
+
+class AuthorAtomFeed(AtomFeedMixin, AuthorFeed):
+    pass
+
+
+def index_scope():
+    return 'index'
+
+
+def group_scope(slug):
+    return f'group:{slug}'
+
+
+def author_scope(username):
+    return f'profile:{username}'
+
+
+# Ленты кэшируются в тех же областях, что и HTML-страницы: purge_pages
+# из сигналов сбрасывает их вместе.
+index_rss = cache_feed(index_scope)(IndexFeed())
+index_atom = cache_feed(index_scope)(IndexAtomFeed())
+group_rss = cache_feed(group_scope)(GroupFeed())
+group_atom = cache_feed(group_scope)(GroupAtomFeed())
+author_rss = cache_feed(author_scope)(AuthorFeed())
+author_atom = cache_feed(author_scope)(AuthorAtomFeed())
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.db import retry_on_lock
+from posts.archive import archive_batch
+from posts.cache import ALL_PAGES, change_posts_count, purge_pages
+from posts.timelines import rebuild_timelines
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты старше --older-than дней из posts_post в архив '
+        'пачками; лента автора и группы продолжает их показывать.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, required=True, metavar='DAYS'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 0:
+            raise CommandError('--older-than не может быть отрицательным.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        cutoff = timezone.now() - timedelta(days=options['older_than'])
+        archived = 0
+        while True:
+            # Пачка — короткая транзакция: записи сайта не ждут всю команду.
+            moved = retry_on_lock(archive_batch)(
+                cutoff, options['batch_size']
+            )
+            if not moved:
+                break
+            archived += moved
+            change_posts_count(-moved)
+        if archived:
+            # Ленты index и групп хранят id: перенесённых там быть не должно.
+            rebuild_timelines()
+            purge_pages(ALL_PAGES)
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено в архив: {archived}'
+        ))
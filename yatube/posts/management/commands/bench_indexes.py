@@ -0,0 +1,129 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from posts.models import Group, Post, User
+from posts.rendering import RENDERED_FIELDS, render_text
+from yatube.settings import POSTS_ON_PAGE
+
+BATCH_SIZE = 10000
+DEEP_PAGE = 1000
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает планы и время запросов лент до и после составных '
+        'индексов Post. Работает на временной тестовой базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--authors', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            self.seed(options['posts'], options['authors'], options['groups'])
+            queries = self.queries()
+            try:
+                with transaction.atomic():
+                    self.drop_indexes()
+                    self.report('Без составных индексов', queries, options)
+                    raise Rollback
+            except Rollback:
+                pass
+            self.report('С составными индексами', queries, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, posts, authors, groups):
+        started = time.perf_counter()
+        User.objects.bulk_create(
+            User(username=f'bench_{i}') for i in range(authors)
+        )
+        Group.objects.bulk_create(
+            Group(title=f'Группа {i}', slug=f'bench-{i}', description='-')
+            for i in range(groups)
+        )
+        author_ids = list(User.objects.values_list('pk', flat=True))
+        group_ids = list(Group.objects.values_list('pk', flat=True)) + [None]
+        start = timezone.now() - timedelta(seconds=posts)
+        # Все NOT NULL столбцы posts_post, включая готовую разметку.
+        columns = (
+            'text', 'pub_date', 'updated_at', 'author_id', 'group_id',
+            'image', *RENDERED_FIELDS
+        )
+        sql = (
+            f'INSERT INTO {Post._meta.db_table} ({", ".join(columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))})'
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            for offset in range(0, posts, BATCH_SIZE):
+                cursor.executemany(sql, [
+                    self.row(i, start, author_ids, group_ids)
+                    for i in range(offset, min(offset + BATCH_SIZE, posts))
+                ])
+            cursor.execute('ANALYZE')
+        self.stdout.write(
+            f'Засеяно постов: {posts} за {time.perf_counter() - started:.1f} с'
+        )
+
+    def row(self, i, start, author_ids, group_ids):
+        text = f'Пост {i}'
+        pub_date = start + timedelta(seconds=i)
+        rendered = render_text(text)
+        return (
+            text, pub_date, pub_date, random.choice(author_ids),
+            random.choice(group_ids), '',
+            *(rendered[field] for field in RENDERED_FIELDS)
+        )
+
+    def queries(self):
+        author = User.objects.order_by('pk').first()
+        group = Group.objects.order_by('pk').first()
+        deep = DEEP_PAGE * POSTS_ON_PAGE
+        boundary = Post.objects.order_by('-pub_date', '-pk')[deep]
+        return {
+            'index': Post.objects.all()[:POSTS_ON_PAGE],
+            'index, глубокая страница': (
+                Post.objects.all()[deep:deep + POSTS_ON_PAGE]
+            ),
+            'index, курсор': Post.objects.filter(
+                pub_date__lt=boundary.pub_date
+            ).order_by('-pub_date', '-pk')[:POSTS_ON_PAGE + 1],
+            'profile': author.posts.all()[:POSTS_ON_PAGE],
+            'group_list': group.posts.all()[:POSTS_ON_PAGE],
+        }
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for index in Post._meta.indexes:
+                cursor.execute(
+                    f'DROP INDEX {connection.ops.quote_name(index.name)}'
+                )
+
+    def report(self, title, queries, options):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for name, queryset in queries.items():
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f'{name}: {statistics.median(timings):.2f} мс\n'
+                f'{queryset.explain()}'
+            )
@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+from datetime import datetime, time as day_start
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from posts.export import EXPORT_CHUNK_SIZE, FORMATS, export_lines, export_rows
+from posts.models import ArchivedPost, Post
+
+PROGRESS_INTERVAL = 5
+
+
+def moment(value):
+    """Дата или дата со временем для --since/--until."""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = day and datetime.combine(day, day_start())
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise CommandError(f'Не удалось разобрать дату: {value}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, timezone.utc)
+    return parsed
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты вместе с архивом в JSONL или CSV (поля id, text, '
+        'pub_date, author, group) по возрастанию id, читая базу курсором '
+        'по частям.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Путь к файлу или «-» для вывода в stdout.'
+        )
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument(
+            '--since', type=moment, help='pub_date не раньше этой даты.'
+        )
+        parser.add_argument(
+            '--until', type=moment, help='pub_date раньше этой даты.'
+        )
+        parser.add_argument('--group', help='slug группы.')
+        parser.add_argument('--author', help='username автора.')
+        parser.add_argument(
+            '--after-id', type=int,
+            help='Продолжить выгрузку после поста с этим id.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        posts = self.filter_posts(Post.objects.all(), options)
+        archived = self.filter_posts(ArchivedPost.objects.all(), options)
+        if path == '-':
+            self.export(sys.stdout, posts, archived, file_format, options)
+            return
+        # Продолжение дописывает файл, а не затирает уже выгруженное;
+        # заголовок CSV нужен, только если файл ещё пуст.
+        append = options['after_id'] is not None
+        header = not (
+            append and os.path.exists(path) and os.path.getsize(path)
+        )
+        with open(path, 'a' if append else 'w', encoding='utf-8',
+                  newline='') as stream:
+            self.export(
+                stream, posts, archived, file_format, options, header
+            )
+
+    def filter_posts(self, posts, options):
+        if options['since']:
+            posts = posts.filter(pub_date__gte=options['since'])
+        if options['until']:
+            posts = posts.filter(pub_date__lt=options['until'])
+        if options['group']:
+            posts = posts.filter(group__slug=options['group'])
+        if options['author']:
+            posts = posts.filter(author__username=options['author'])
+        return posts
+
+    def export(self, stream, posts, archived, file_format, options,
+               header=True):
+        self.last_id = options['after_id']
+        self.exported = 0
+        rows = self.track(
+            export_rows(
+                posts, options['after_id'], options['chunk_size'], archived
+            )
+        )
+        lines = export_lines(rows, file_format)
+        if file_format == 'csv' and not header:
+            next(lines)  # заголовок уже есть в начале файла
+        started = reported = time.perf_counter()
+        for line in lines:
+            stream.write(line)
+            if time.perf_counter() - reported > PROGRESS_INTERVAL:
+                reported = time.perf_counter()
+                self.stderr.write(self.progress(started))
+        self.stderr.write(self.style.SUCCESS(self.progress(started)))
+
+    def track(self, rows):
+        """Запоминает id последней строки: с него можно продолжить."""
+        for row in rows:
+            self.last_id = row[0]
+            self.exported += 1
+            yield row
+
+    def progress(self, started):
+        elapsed = time.perf_counter() - started
+        return (
+            f'Выгружено: {self.exported}, последний id: {self.last_id}, '
+            f'{self.exported / elapsed if elapsed else 0:.0f} строк/с'
+        )
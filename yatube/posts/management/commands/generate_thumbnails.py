@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import ArchivedPost, Post
+from posts.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        'Заранее делает миниатюры для всех картинок постов, у которых их '
+        'ещё нет, например для загруженных до появления пула.'
+    )
+
+    def handle(self, *args, **options):
+        done = failed = 0
+        for model in (Post, ArchivedPost):
+            images = model.objects.exclude(image='').values_list(
+                'pk', 'image'
+            ).iterator()
+            for pk, name in images:
+                if self.generate(name, [(model, pk)]):
+                    done += 1
+                else:
+                    failed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Картинок с миниатюрами: {done}, ошибок: {failed}'
+        ))
+
+    def generate(self, name, posts):
+        try:
+            generate_thumbnails(name, posts)
+        except OSError as error:
+            self.stderr.write(f'{name}: {error}')
+            return False
+        return True
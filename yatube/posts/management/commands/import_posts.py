@@ -0,0 +1,209 @@
+import csv
+import json
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.cache import ALL_PAGES, purge_pages
+from posts.models import Group, Post, User
+from posts.rendering import render_text
+from posts.signals import change_author_count, change_group_count
+from posts.timelines import rebuild_timelines
+
+FORMATS = ('jsonl', 'csv')
+FIELDS = ('text', 'author', 'group', 'pub_date')
+PROGRESS_INTERVAL = 5
+BAD_LINES_SHOWN = 20
+
+
+@contextmanager
+def keep_pub_date():
+    """
+    Даёт bulk_create сохранить pub_date из файла.
+
+    auto_now_add перезаписывает дату при вставке, а при переносе постов
+    нужна исходная.
+    """
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def parse_pub_date(value, default):
+    if not value:
+        return default
+    try:
+        pub_date = parse_datetime(value)
+    except ValueError:
+        return None
+    if pub_date is not None and timezone.is_naive(pub_date):
+        pub_date = timezone.make_aware(pub_date, timezone.utc)
+    return pub_date
+
+
+def valid_row(row):
+    return isinstance(row, dict) and all(
+        isinstance(row.get(field), (str, type(None))) for field in FIELDS
+    )
+
+
+class BadLines:
+    """
+    Число битых строк и номера первых BAD_LINES_SHOWN из них.
+
+    Память не растёт с размером файла, сколько бы в нём ни было ошибок.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.shown = []
+
+    def add(self, number):
+        self.count += 1
+        if len(self.shown) < BAD_LINES_SHOWN:
+            self.shown.append(number)
+
+
+def read_rows(stream, file_format, bad_lines):
+    """
+    Строки файла как словари.
+
+    Неразбираемые строки и строки не того вида пропускаются и учитываются
+    в bad_lines (BadLines): импорт не обрывается на середине файла.
+    """
+    if file_format == 'csv':
+        rows = csv.DictReader(stream)
+        for row in rows:
+            if valid_row(row):
+                yield row
+            else:
+                bad_lines.add(rows.line_num)
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if valid_row(row):
+            yield row
+        else:
+            bad_lines.add(number)
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из JSONL или CSV (поля text, author, group, '
+        'pub_date) пачками через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Путь к файлу или «-» для чтения из stdin.'
+        )
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        if path == '-':
+            self.import_stream(sys.stdin, file_format, options['batch_size'])
+            return
+        with open(path, encoding='utf-8', newline='') as stream:
+            self.import_stream(stream, file_format, options['batch_size'])
+
+    def import_stream(self, stream, file_format, batch_size):
+        self.bad_lines = BadLines()
+        rows = read_rows(stream, file_format, self.bad_lines)
+        started = reported = time.perf_counter()
+        imported = skipped = 0
+        with keep_pub_date():
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                created = self.import_batch(batch)
+                imported += created
+                skipped += len(batch) - created
+                if time.perf_counter() - reported > PROGRESS_INTERVAL:
+                    reported = time.perf_counter()
+                    self.stdout.write(
+                        self.progress(imported, skipped, started)
+                    )
+        # Импорт идёт мимо сигналов, а посты могут встать в любое место лент.
+        rebuild_timelines()
+        purge_pages(ALL_PAGES)
+        self.stdout.write(self.style.SUCCESS(
+            self.progress(imported, skipped, started)
+        ))
+        if self.bad_lines.count:
+            shown = ', '.join(map(str, self.bad_lines.shown))
+            more = self.bad_lines.count > len(self.bad_lines.shown)
+            self.stderr.write(
+                f'Не разобраны строки: {shown}{" и другие" if more else ""}'
+            )
+
+    def progress(self, imported, skipped, started):
+        elapsed = time.perf_counter() - started
+        return (
+            f'Импортировано: {imported}, пропущено: {skipped}, '
+            f'битых строк: {self.bad_lines.count}, '
+            f'{imported / elapsed if elapsed else 0:.0f} строк/с'
+        )
+
+    def import_batch(self, batch):
+        """Вставляет пачку, пропуская строки с неизвестным автором и т. п."""
+        authors = dict(User.objects.filter(
+            username__in={row.get('author') for row in batch}
+        ).values_list('username', 'pk'))
+        groups = dict(Group.objects.filter(
+            slug__in={row.get('group') for row in batch if row.get('group')}
+        ).values_list('slug', 'pk'))
+        now = timezone.now()
+        posts = [
+            post for post in (
+                self.build_post(row, authors, groups, now) for row in batch
+            )
+            if post is not None
+        ]
+        with transaction.atomic():
+            Post.objects.bulk_create(posts)
+            # bulk_create не шлёт сигналов: счётчики правим сами.
+            for author_id, count in Counter(
+                    post.author_id for post in posts).items():
+                change_author_count(author_id, count)
+            for group_id, count in Counter(
+                    post.group_id for post in posts).items():
+                change_group_count(group_id, count)
+        return len(posts)
+
+    def build_post(self, row, authors, groups, now):
+        group = row.get('group')
+        pub_date = parse_pub_date(row.get('pub_date'), now)
+        if (not row.get('text') or row.get('author') not in authors
+                or (group and group not in groups) or pub_date is None):
+            return None
+        return Post(
+            text=row['text'],
+            author_id=authors[row['author']],
+            group_id=groups.get(group),
+            pub_date=pub_date,
+            # bulk_create не вызывает save(): разметку готовим сами.
+            **render_text(row['text']),
+        )
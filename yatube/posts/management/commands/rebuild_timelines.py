@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts.timelines import rebuild_timelines
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново собирает в кэше списки последних постов для index и всех '
+        'групп, например после холодного старта или массового импорта.'
+    )
+
+    def handle(self, *args, **options):
+        groups = rebuild_timelines()
+        self.stdout.write(self.style.SUCCESS(
+            f'Собраны ленты: index и {groups} групп'
+        ))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import ArchivedPost, AuthorStats, Group, Post, User
+
+BATCH_SIZE = 1000
+
+
+def count_rows(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by().values(field)
+        .annotate(count=Count('pk')).values('count')
+    ), 0)
+
+
+def posts_count(field):
+    """
+    Подзапрос с числом постов для автора или группы из внешнего запроса.
+
+    Архивные посты тоже считаются: они видны в ленте автора и группы.
+    """
+    return count_rows(Post, field) + count_rows(ArchivedPost, field)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов у авторов и групп.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            AuthorStats.objects.bulk_create(
+                (
+                    AuthorStats(author_id=pk) for pk in User.objects
+                    .filter(stats__isnull=True)
+                    .values_list('pk', flat=True)
+                ),
+                batch_size=BATCH_SIZE,
+            )
+            authors = AuthorStats.objects.update(
+                posts_count=posts_count('author')
+            )
+            groups = Group.objects.update(posts_count=posts_count('group'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано авторов: {authors}, групп: {groups}'
+        ))
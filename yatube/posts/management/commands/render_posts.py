@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.cache import ALL_PAGES, purge_pages
+from posts.models import ArchivedPost, Post
+from posts.rendering import render_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново строит готовую разметку постов (text_html, excerpt_html, '
+        'short_text), например после правки текста мимо save().'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        rendered = sum(
+            render_posts(model.objects.all(), options['batch_size'])
+            for model in (Post, ArchivedPost)
+        )
+        purge_pages(ALL_PAGES)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано постов: {rendered}'
+        ))
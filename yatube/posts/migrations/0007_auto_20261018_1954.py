@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_posts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Group = apps.get_model('posts', 'Group')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    posts = Post.objects.order_by()
+    for author_id, count in posts.values_list('author').annotate(
+            count=models.Count('pk')):
+        AuthorStats.objects.create(author_id=author_id, posts_count=count)
+    for group_id, count in posts.filter(group__isnull=False).values_list(
+            'group').annotate(count=models.Count('pk')):
+        Group.objects.filter(pk=group_id).update(posts_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0006_auto_20221104_1933'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Число постов')),
+            ],
+            options={
+                'verbose_name': 'Статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число постов'),
+        ),
+        migrations.RunPython(count_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+# SQL записан прямо здесь: миграция не должна меняться вместе с posts.search.
+CREATE_SQL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts USING fts5(
+        text, content='posts_post', content_rowid='id',
+        tokenize='unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS posts_post_fts_insert
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_post_fts_delete
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS posts_post_fts_update
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text);
+    END""",
+    "INSERT INTO posts_post_fts(posts_post_fts) VALUES ('rebuild')",
+]
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS posts_post_fts_insert',
+    'DROP TRIGGER IF EXISTS posts_post_fts_delete',
+    'DROP TRIGGER IF EXISTS posts_post_fts_update',
+    'DROP TABLE IF EXISTS posts_post_fts',
+]
+
+
+def run_sql(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        with schema_editor.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_auto_20261018_1956'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sql(CREATE_SQL), run_sql(DROP_SQL)),
+    ]
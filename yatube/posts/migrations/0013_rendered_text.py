@@ -0,0 +1,72 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:41
+
+from django.db import migrations, models
+from django.template.defaultfilters import (
+    linebreaks_filter, linebreaksbr, truncatechars, truncatewords
+)
+
+# Разметка записана прямо здесь: миграция не должна меняться вместе
+# с posts.rendering.
+BATCH_SIZE = 1000
+FIELDS = ('text_html', 'excerpt_html', 'short_text')
+
+
+def render_existing(apps, schema_editor):
+    for name in ('Post', 'ArchivedPost'):
+        model = apps.get_model('posts', name)
+        posts = model.objects.only('pk', 'text').order_by('pk')
+        last_pk = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:BATCH_SIZE])
+            if not batch:
+                break
+            for post in batch:
+                post.text_html = linebreaks_filter(post.text)
+                post.excerpt_html = truncatewords(linebreaksbr(post.text), 30)
+                post.short_text = truncatechars(post.text, 30)
+            model.objects.bulk_update(batch, FIELDS)
+            last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_auto_20261018_2026'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(default='', editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_html',
+            field=models.TextField(default='', editable=False, verbose_name='Начало текста в HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='short_text',
+            field=models.CharField(default='', editable=False, max_length=30, verbose_name='Заголовок'),
+        ),
+        migrations.AddField(
+            model_name='archivedpost',
+            name='text_html',
+            field=models.TextField(default='', verbose_name='Текст в HTML'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='archivedpost',
+            name='excerpt_html',
+            field=models.TextField(default='', verbose_name='Начало текста в HTML'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='archivedpost',
+            name='short_text',
+            field=models.CharField(default='', max_length=30, verbose_name='Заголовок'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
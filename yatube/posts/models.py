@@ -3,6 +3,8 @@ from django.db import models
 # Create your models here.
 from django.contrib.auth import get_user_model
 
+from .rendering import RENDERED_FIELDS, SHORT_TEXT_LENGTH, render_text
+
 User = get_user_model()
 
 
@@ -13,6 +15,10 @@ class Group(models.Model):
         verbose_name='Идентификатор'
     )
     description = models.TextField(verbose_name='Описание группы')
+    posts_count = models.PositiveIntegerField(
+        default=0, editable=False,
+        verbose_name='Число постов'
+    )
 
     class Meta:
         verbose_name_plural = 'Группы'
@@ -31,6 +37,10 @@ class Post(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE, related_name="posts",
@@ -45,11 +55,153 @@ class Post(models.Model):
         verbose_name='Группа',
         help_text='Группа, к которой будет относиться пост'
     )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True,
+        help_text='Загрузите картинку'
+    )
+    # Готовая разметка для лент: шаблоны не гоняют фильтры по text.
+    text_html = models.TextField(
+        default='', editable=False, verbose_name='Текст в HTML'
+    )
+    excerpt_html = models.TextField(
+        default='', editable=False, verbose_name='Начало текста в HTML'
+    )
+    short_text = models.CharField(
+        max_length=SHORT_TEXT_LENGTH, default='', editable=False,
+        verbose_name='Заголовок'
+    )
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_feed_idx'
+            ),
+            models.Index(fields=['-pub_date', '-id'], name='post_feed_idx'),
+            models.Index(
+                fields=['author', 'updated_at'],
+                name='post_author_updated_idx'
+            ),
+            models.Index(
+                fields=['group', 'updated_at'],
+                name='post_group_updated_idx'
+            ),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
+    is_archived = False
+
     def __str__(self):
         return self.text[:20]
+
+    def save(self, *args, update_fields=None, **kwargs):
+        for field, value in render_text(self.text).items():
+            setattr(self, field, value)
+        if update_fields is not None and 'text' in update_fields:
+            update_fields = {*update_fields, *RENDERED_FIELDS}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # Группа на момент загрузки: по ней сигналы правят счётчики.
+        if 'group_id' in post.__dict__:
+            post._loaded_group_id = post.group_id
+        return post
+
+
+class ArchivedPost(models.Model):
+    """
+    Старый пост, перенесённый из posts_post командой archive_posts.
+
+    id сохраняется, поэтому адрес поста не меняется. Только для чтения.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст поста')
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+    updated_at = models.DateTimeField(verbose_name='Дата изменения')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE, related_name='archived_posts',
+        verbose_name='Автор поста'
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        blank=True,
+        null=True,
+        verbose_name='Группа'
+    )
+    image = models.ImageField('Картинка', upload_to='posts/', blank=True)
+    text_html = models.TextField(verbose_name='Текст в HTML')
+    excerpt_html = models.TextField(verbose_name='Начало текста в HTML')
+    short_text = models.CharField(
+        max_length=SHORT_TEXT_LENGTH, verbose_name='Заголовок'
+    )
+
+    class Meta:
+        ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='archive_author_feed_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='archive_group_feed_idx'
+            ),
+            models.Index(fields=['-pub_date', '-id'], name='archive_feed_idx'),
+        ]
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архив постов'
+
+    is_archived = True
+
+    def __str__(self):
+        return self.text[:20]
+
+    @classmethod
+    def from_post(cls, post):
+        return cls(
+            id=post.pk,
+            text=post.text,
+            pub_date=post.pub_date,
+            updated_at=post.updated_at,
+            author_id=post.author_id,
+            group_id=post.group_id,
+            image=post.image.name,
+            text_html=post.text_html,
+            excerpt_html=post.excerpt_html,
+            short_text=post.short_text,
+        )
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число постов'
+    )
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
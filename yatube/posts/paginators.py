@@ -0,0 +1,214 @@
+import base64
+import binascii
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+NEXT = 'n'
+PREVIOUS = 'p'
+ON_EACH_SIDE = 2
+ON_ENDS = 1
+
+
+def encode_cursor(direction, post):
+    raw = f'{direction}|{post.pub_date.isoformat()}|{post.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Возвращает (направление, pub_date, id) или бросает ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date, pk = parse_datetime(pub_date), int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError(f'Некорректный курсор: {cursor!r}')
+    if direction not in (NEXT, PREVIOUS) or pub_date is None:
+        raise ValueError(f'Некорректный курсор: {cursor!r}')
+    return direction, pub_date, pk
+
+
+def elided_page_range(page, on_each_side=ON_EACH_SIDE, on_ends=ON_ENDS):
+    """
+    Номера страниц для навигации: края ленты и окрестность текущей.
+
+    На месте пропущенных номеров стоит None. Длина списка не зависит от
+    числа страниц.
+    """
+    last = max(page.paginator.num_pages, page.number + page.has_next())
+    numbers = sorted({
+        *range(1, on_ends + 1),
+        *range(page.number - on_each_side, page.number + on_each_side + 1),
+        *range(last - on_ends + 1, last + 1),
+    })
+    page_range = []
+    previous = 0
+    for number in numbers:
+        if not 1 <= number <= last:
+            continue
+        if number - previous > 1:
+            page_range.append(None)
+        page_range.append(number)
+        previous = number
+    return page_range
+
+
+class CursorPage:
+    """Страница ленты, выбранная по курсору (pub_date, id)."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def next_cursor(self):
+        if self._has_next:
+            return encode_cursor(NEXT, self.object_list[-1])
+
+    def previous_cursor(self):
+        if self._has_previous:
+            return encode_cursor(PREVIOUS, self.object_list[0])
+
+
+class CursorPaginator:
+    """
+    Постраничный вывод по ключу (pub_date, id) вместо OFFSET.
+
+    Не считает COUNT(*) и не пропускает строки, поэтому глубокие страницы
+    стоят столько же, сколько первая. archived — queryset архива, все посты
+    которого старше постов queryset: лента продолжается им.
+    """
+
+    def __init__(self, queryset, per_page, archived=None):
+        self.querysets = [queryset]
+        if archived is not None:
+            self.querysets.append(archived)
+        self.per_page = per_page
+
+    def rows(self, querysets, condition, *ordering):
+        rows = []
+        for queryset in querysets:
+            rows += queryset.filter(condition).order_by(*ordering)[
+                :self.per_page + 1 - len(rows)
+            ]
+            if len(rows) > self.per_page:
+                break
+        return rows
+
+    def first_page(self):
+        rows = self.rows(self.querysets, Q(), '-pub_date', '-pk')
+        return CursorPage(
+            rows[:self.per_page], self, len(rows) > self.per_page, False
+        )
+
+    def page(self, cursor):
+        try:
+            direction, pub_date, pk = decode_cursor(cursor)
+        except ValueError:
+            return self.first_page()
+        if direction == NEXT:
+            rows = self.rows(
+                self.querysets,
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk),
+                '-pub_date', '-pk'
+            )
+            if not rows:
+                # Курсор за концом ленты (хвост удалён или подделан).
+                return self.first_page()
+            return CursorPage(
+                rows[:self.per_page], self, len(rows) > self.per_page, True
+            )
+        rows = self.rows(
+            self.querysets[::-1],
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk),
+            'pub_date', 'pk'
+        )
+        if len(rows) <= self.per_page:
+            # Дошли до начала ленты: отдаём полную первую страницу.
+            return self.first_page()
+        return CursorPage(rows[self.per_page - 1::-1], self, True, True)
+
+
+class CountFreePage(Page):
+    """Страница, которая знает о следующей без COUNT(*)."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CountFreePaginator(Paginator):
+    """
+    Paginator, который не считает строки на каждый запрос.
+
+    Следующую страницу выдаёт лишняя (per_page + 1) строка выборки, а count
+    и num_pages берутся из count() — как правило, из кэша и приблизительно.
+    """
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.get_count = count
+
+    @cached_property
+    def count(self):
+        return self.get_count()
+
+    def validate_number(self, number):
+        # Верхнюю границу проверяет сама выборка: count лишь оценка.
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы не является целым числом')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('На этой странице нет результатов')
+        return CountFreePage(
+            rows[:self.per_page], number, self, len(rows) > self.per_page
+        )
+
+    def get_page(self, number):
+        try:
+            return self.page(number)
+        except PageNotAnInteger:
+            return self.page(1)
+        except EmptyPage:
+            try:
+                return self.page(max(self.num_pages, 1))
+            except EmptyPage:
+                return self.page(1)
@@ -0,0 +1,44 @@
+from django.template.defaultfilters import (
+    linebreaks_filter, linebreaksbr, truncatechars, truncatewords
+)
+
+EXCERPT_WORDS = 30
+SHORT_TEXT_LENGTH = 30
+RENDERED_FIELDS = ('text_html', 'excerpt_html', 'short_text')
+
+
+def render_text(text):
+    """
+    Готовые представления текста поста для шаблонов лент.
+
+    Те же фильтры, что раньше стояли в шаблонах, поэтому разметка
+    не меняется: text|linebreaks, text|linebreaksbr|truncatewords:30
+    и text|truncatechars:30.
+    """
+    return {
+        'text_html': linebreaks_filter(text),
+        'excerpt_html': truncatewords(linebreaksbr(text), EXCERPT_WORDS),
+        'short_text': truncatechars(text, SHORT_TEXT_LENGTH),
+    }
+
+
+def render_posts(queryset, batch_size=1000):
+    """
+    Пересчитывает RENDERED_FIELDS у постов queryset пачками bulk_update.
+
+    Читает только id и text, пачки идут по ключу pk, а не курсором:
+    SQLite не изолирует курсор от записей в ту же таблицу. Дата изменения
+    и сигналы не трогаются. Возвращает число обработанных постов.
+    """
+    posts = queryset.only('pk', 'text').order_by('pk')
+    rendered = last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return rendered
+        for post in batch:
+            for field, value in render_text(post.text).items():
+                setattr(post, field, value)
+        queryset.model.objects.bulk_update(batch, RENDERED_FIELDS)
+        rendered += len(batch)
+        last_pk = batch[-1].pk
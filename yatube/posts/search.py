@@ -0,0 +1,123 @@
+import re
+
+from django.db import connection, connections
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+POST_TABLE = Post._meta.db_table
+
+# Внешний FTS5-индекс по posts_post.text; триггеры держат его в актуальном
+# состоянии при любых вставках, правках и удалениях, включая bulk_create.
+FTS_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        text, content='{POST_TABLE}', content_rowid='id',
+        tokenize='unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON {POST_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON {POST_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF text ON {POST_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+]
+MATCH_SQL = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+
+
+def fts_enabled(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install_fts(using):
+    """
+    Создаёт FTS-таблицу и триггеры, если их нет.
+
+    SQLite при перестройке posts_post в миграциях теряет триггеры, поэтому
+    вызывается после каждого migrate. Первичное наполнение индекса —
+    в миграции 0009.
+    """
+    if not fts_enabled(using):
+        return
+    with using.cursor() as cursor:
+        for sql in FTS_SQL:
+            cursor.execute(sql)
+
+
+def restore_fts(sender, using, **kwargs):
+    """Обработчик post_migrate: возвращает триггеры уже созданного индекса."""
+    connection = connections[using]
+    if FTS_TABLE in connection.introspection.table_names():
+        install_fts(connection)
+
+
+def match_expression(query):
+    """Запрос FTS5 из слов пользователя: все слова, каждое в кавычках."""
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', query))
+
+
+class SearchResults:
+    """
+    Найденные посты по убыванию релевантности (bm25).
+
+    Поддерживает count() и срезы, поэтому подходит для Paginator.
+    """
+
+    def __init__(self, query, queryset):
+        self.match = match_expression(query)
+        self.queryset = queryset
+
+    def count(self):
+        if not self.match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s', [self.match]
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.match:
+            return []
+        start = index.start or 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'{MATCH_SQL} ORDER BY rank LIMIT %s OFFSET %s',
+                [self.match, index.stop - start, start]
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search_posts(query, queryset):
+    if fts_enabled():
+        return SearchResults(query, queryset)
+    if not query:
+        return queryset.none()
+    return queryset.filter(text__icontains=query)
+
+
+def filter_by_search(queryset, query):
+    """Ограничивает queryset постами, найденными по индексу."""
+    if not fts_enabled():
+        return queryset.filter(text__icontains=query)
+    match = match_expression(query)
+    if not match:
+        return queryset.none()
+    return queryset.filter(pk__in=RawSQL(MATCH_SQL, [match]))
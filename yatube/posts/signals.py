@@ -0,0 +1,122 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import (
+    ALL_PAGES, bump_versions, change_posts_count, feed_scopes, purge_pages,
+    version_key
+)
+from .models import ArchivedPost, AuthorStats, Group, Post, User
+from .thumbnails import schedule_thumbnails
+from .timelines import add_post, drop_timeline, remove_post
+
+
+def change_group_count(group_id, delta):
+    if group_id is None:
+        return
+    groups = Group.objects.filter(pk=group_id)
+    if delta < 0:
+        groups = groups.filter(posts_count__gt=0)
+    groups.update(posts_count=F('posts_count') + delta)
+
+
+def change_author_count(author_id, delta):
+    stats = AuthorStats.objects.filter(author_id=author_id)
+    if delta < 0:
+        stats = stats.filter(posts_count__gt=0)
+    if stats.update(posts_count=F('posts_count') + delta) or delta < 0:
+        return
+    # Счётчика ещё нет: заводим его сразу с точным значением.
+    AuthorStats.objects.get_or_create(
+        author_id=author_id,
+        defaults={'posts_count': sum(
+            model.objects.filter(author_id=author_id).count()
+            for model in (Post, ArchivedPost)
+        )}
+    )
+
+
+def after_commit(func, *args):
+    """
+    Правки кэша — только после фиксации транзакции.
+
+    Иначе анонимный запрос между сбросом и фиксацией закэширует старые
+    строки под новой версией, а откат или повтор записи оставит в кэше
+    ленты и счётчики несостоявшейся правки.
+    """
+    transaction.on_commit(partial(func, *args))
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    loaded_group_id = getattr(instance, '_loaded_group_id', instance.group_id)
+    if created:
+        change_author_count(instance.author_id, 1)
+        change_group_count(instance.group_id, 1)
+        after_commit(change_posts_count, 1)
+        after_commit(add_post, instance)
+        after_commit(add_post, instance, instance.group_id)
+    elif loaded_group_id != instance.group_id:
+        change_group_count(loaded_group_id, -1)
+        change_group_count(instance.group_id, 1)
+        after_commit(remove_post, instance.pk, loaded_group_id)
+        after_commit(add_post, instance, instance.group_id)
+    instance._loaded_group_id = instance.group_id
+    after_commit(bump_versions, version_key('post', instance.pk))
+    after_commit(purge_pages, *feed_scopes(
+        instance, instance.group_id, loaded_group_id
+    ))
+    if instance.image:
+        # Файл уже сохранён, а пул начнёт работу после фиксации транзакции.
+        # Уже нарезанную миниатюру пул не режет и страниц не сбрасывает.
+        after_commit(
+            schedule_thumbnails, instance.image.name, [(Post, instance.pk)]
+        )
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    change_author_count(instance.author_id, -1)
+    change_group_count(instance.group_id, -1)
+    after_commit(change_posts_count, -1)
+    after_commit(remove_post, instance.pk)
+    after_commit(remove_post, instance.pk, instance.group_id)
+    after_commit(purge_pages, *feed_scopes(instance, instance.group_id))
+
+
+@receiver(post_delete, sender=ArchivedPost)
+def archived_post_deleted(sender, instance, **kwargs):
+    # Перенос в архив идёт без сигналов, а удаление из архива — с ними.
+    change_author_count(instance.author_id, -1)
+    change_group_count(instance.group_id, -1)
+    after_commit(bump_versions, version_key('post', instance.pk))
+    after_commit(purge_pages, *feed_scopes(instance, instance.group_id))
+
+
+@receiver(post_save, sender=Group)
+def bump_group_version(sender, instance, created, **kwargs):
+    after_commit(bump_versions, version_key('group', instance.pk))
+    if not created:
+        after_commit(purge_pages, ALL_PAGES)
+
+
+@receiver(post_delete, sender=Group)
+def purge_group_pages(sender, instance, **kwargs):
+    # Посты группы остались без неё: меняются карточки во всех лентах.
+    after_commit(drop_timeline, instance.pk)
+    after_commit(purge_pages, ALL_PAGES)
+
+
+@receiver(post_save, sender=User)
+def bump_author_version(sender, instance, created, update_fields=None,
+                        **kwargs):
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    after_commit(bump_versions, version_key('author', instance.pk))
+    if not created:
+        after_commit(purge_pages, ALL_PAGES)
@@ -0,0 +1,131 @@
+import json
+from datetime import datetime
+
+from django.contrib.admin.models import LogEntry
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post, User
+
+GROUP_SLUG = 'test_slug'
+GROUP_SLUG_OTHER = 'test_slug_other'
+GROUPS_COUNT = 30
+CHANGELIST_URL = reverse('admin:posts_post_changelist')
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='password'
+        )
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа1', slug=GROUP_SLUG, description='Описание'
+        )
+        cls.group_other = Group.objects.create(
+            title='Группа2', slug=GROUP_SLUG_OTHER, description='Описание'
+        )
+        Group.objects.bulk_create(
+            Group(title=f'Лишняя {i}', slug=f'extra-{i}', description='-')
+            for i in range(GROUPS_COUNT)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def fill(self, size):
+        Post.objects.all().delete()
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.author, group=self.group)
+            for i in range(size)
+        )
+        cache.clear()
+
+    def changelist_queries(self):
+        self.client.get(CHANGELIST_URL)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(CHANGELIST_URL)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries]
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.fill(5)
+        few = self.changelist_queries()
+        self.fill(100)
+        many = self.changelist_queries()
+        self.assertEqual(len(few), len(many))
+        self.assertFalse([sql for sql in many if 'COUNT(' in sql.upper()])
+
+    def test_changelist_does_not_render_every_group(self):
+        self.fill(5)
+        response = self.client.get(CHANGELIST_URL)
+        self.assertNotContains(response, 'Лишняя')
+
+    def test_date_hierarchy(self):
+        self.fill(5)
+        post = Post.objects.first()
+        response = self.client.get(CHANGELIST_URL, {
+            'pub_date__year': post.pub_date.year,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), 5)
+
+    def test_date_hierarchy_does_not_scan_dates(self):
+        self.fill(3)
+        for pk, year in zip(
+                Post.objects.values_list('pk', flat=True), [2019, 2021, 2021]):
+            Post.objects.filter(pk=pk).update(pub_date=timezone.make_aware(
+                datetime(year, 5, 1)
+            ))
+        sql = ' '.join(self.changelist_queries())
+        self.assertNotIn('DISTINCT', sql.upper())
+        response = self.client.get(CHANGELIST_URL)
+        for year, shown in [(2019, True), (2020, False), (2021, True)]:
+            with self.subTest(year=year):
+                self.assertEqual(
+                    f'?pub_date__year={year}"' in response.content.decode(),
+                    shown
+                )
+
+    def test_list_editable_saves_in_one_batch(self):
+        self.fill(3)
+        posts = list(Post.objects.order_by('-pub_date', '-pk'))
+        data = {
+            'form-TOTAL_FORMS': len(posts),
+            'form-INITIAL_FORMS': len(posts),
+            '_save': 'Сохранить',
+        }
+        for number, post in enumerate(posts):
+            data[f'form-{number}-id'] = post.pk
+            data[f'form-{number}-group'] = self.group_other.pk
+        response = self.client.post(CHANGELIST_URL, data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.group_other.posts.count(), len(posts))
+        self.assertEqual(LogEntry.objects.count(), len(posts))
+        self.group_other.refresh_from_db()
+        self.assertEqual(self.group_other.posts_count, len(posts))
+
+    def test_export_action_streams_selected_posts(self):
+        self.fill(3)
+        selected = list(Post.objects.order_by('pk')[:2])
+        response = self.client.post(CHANGELIST_URL, {
+            'action': 'export_jsonl',
+            '_selected_action': [post.pk for post in selected],
+        })
+        self.assertTrue(response.streaming)
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(
+            [row['id'] for row in rows], [post.pk for post in selected]
+        )
+        self.assertEqual(rows[0]['group'], GROUP_SLUG)
@@ -0,0 +1,99 @@
+import json
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.paginators import NEXT, encode_cursor
+from yatube.settings import POSTS_ON_PAGE
+
+USERNAME = 'UserAuthor'
+USERNAME_OTHER = 'UserOther'
+GROUP_SLUG = 'test_slug'
+POSTS_COUNT = POSTS_ON_PAGE + 3
+
+API_POST_LIST_URL = reverse('posts:api_post_list')
+API_GROUP_LIST_URL = reverse('posts:api_group_list', args=[GROUP_SLUG])
+API_PROFILE_URL = reverse('posts:api_profile', args=[USERNAME])
+
+
+class PostApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.user_other = User.objects.create_user(username=USERNAME_OTHER)
+        cls.group = Group.objects.create(
+            title='Группа1', slug=GROUP_SLUG, description='Описание'
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=cls.user, group=cls.group)
+            for i in range(POSTS_COUNT)
+        )
+        cls.post_other = Post.objects.create(
+            text='Чужой пост', author=cls.user_other
+        )
+
+    def setUp(self):
+        self.guest = Client()
+
+    def test_post_detail(self):
+        response = self.guest.get(
+            reverse('posts:api_post_detail', args=[self.post_other.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['id'], self.post_other.pk)
+        self.assertEqual(data['text'], self.post_other.text)
+        self.assertEqual(data['author'], USERNAME_OTHER)
+        self.assertIsNone(data['group'])
+
+    def test_feeds_follow_cursor(self):
+        for url, expected in [
+            [API_POST_LIST_URL, POSTS_COUNT + 1],
+            [API_GROUP_LIST_URL, POSTS_COUNT],
+            [API_PROFILE_URL, POSTS_COUNT],
+        ]:
+            with self.subTest(url=url):
+                ids = []
+                next_url = url
+                while next_url:
+                    data = self.guest.get(next_url).json()
+                    self.assertLessEqual(len(data['results']), POSTS_ON_PAGE)
+                    ids += [post['id'] for post in data['results']]
+                    next_url = data['next']
+                self.assertEqual(len(ids), expected)
+                self.assertEqual(len(set(ids)), expected)
+
+    def test_cursor_past_the_end_gives_first_page(self):
+        oldest = Post.objects.order_by('pub_date', 'pk').first()
+        response = self.guest.get(
+            API_POST_LIST_URL, {'cursor': encode_cursor(NEXT, oldest)}
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['results']), POSTS_ON_PAGE)
+        self.assertIsNone(data['previous'])
+
+    def test_export_streams_all_posts(self):
+        for url in [API_GROUP_LIST_URL, API_PROFILE_URL]:
+            with self.subTest(url=url):
+                response = self.guest.get(url, {'all': 1})
+                self.assertTrue(response.streaming)
+                posts = json.loads(b''.join(response.streaming_content))
+                self.assertEqual(len(posts), POSTS_COUNT)
+                self.assertEqual(
+                    {post['author'] for post in posts}, {USERNAME}
+                )
+
+    def test_missing_objects_return_not_found(self):
+        for url in [
+            reverse('posts:api_post_detail', args=[self.post_other.pk + 100]),
+            reverse('posts:api_group_list', args=['nothing']),
+            reverse('posts:api_profile', args=['nobody']),
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(self.guest.get(url).status_code, 404)
+
+    def test_api_is_read_only(self):
+        self.assertEqual(self.guest.post(API_POST_LIST_URL).status_code, 405)
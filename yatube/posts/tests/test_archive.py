@@ -0,0 +1,184 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import ArchivedPost, AuthorStats, Group, Post, User
+from yatube.settings import POSTS_ON_PAGE
+
+USERNAME = 'UserAuthor'
+GROUP_SLUG = 'test_slug'
+OLD_COUNT = POSTS_ON_PAGE + 3
+NEW_COUNT = POSTS_ON_PAGE - 4
+OLDER_THAN_DAYS = 30
+
+PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+GROUP_LIST_URL = reverse('posts:group_list', args=[GROUP_SLUG])
+API_PROFILE_URL = reverse('posts:api_profile', args=[USERNAME])
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Группа1', slug=GROUP_SLUG, description='Описание'
+        )
+        for i in range(OLD_COUNT + NEW_COUNT):
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.user, group=cls.group
+            )
+        old = Post.objects.order_by('pk')[:OLD_COUNT]
+        Post.objects.filter(pk__in=[post.pk for post in old]).update(
+            pub_date=timezone.now() - timedelta(days=OLDER_THAN_DAYS + 1)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.author = Client()
+        self.author.force_login(self.user)
+
+    def feed_ids(self):
+        return list(
+            Post.objects.order_by('-pub_date', '-pk')
+            .values_list('pk', flat=True)
+        )
+
+    def archive(self):
+        call_command(
+            'archive_posts', '--older-than', str(OLDER_THAN_DAYS),
+            '--batch-size', '5', stdout=StringIO()
+        )
+
+    def test_archive_moves_only_old_posts(self):
+        feed_ids = self.feed_ids()
+        self.archive()
+        self.assertEqual(Post.objects.count(), NEW_COUNT)
+        self.assertEqual(ArchivedPost.objects.count(), OLD_COUNT)
+        self.assertEqual(
+            list(ArchivedPost.objects.order_by('-pub_date', '-pk')
+                 .values_list('pk', flat=True)),
+            feed_ids[NEW_COUNT:]
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, OLD_COUNT + NEW_COUNT)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).posts_count,
+            OLD_COUNT + NEW_COUNT
+        )
+
+    def test_feeds_continue_into_archive(self):
+        feed_ids = self.feed_ids()
+        self.archive()
+        for url in [PROFILE_URL, GROUP_LIST_URL]:
+            for page in [1, 2]:
+                with self.subTest(url=url, page=page):
+                    page_obj = self.guest.get(
+                        url, {'page': page}
+                    ).context['page_obj']
+                    self.assertEqual(
+                        page_obj.paginator.count, OLD_COUNT + NEW_COUNT
+                    )
+                    self.assertEqual(
+                        [post.pk for post in page_obj],
+                        feed_ids[
+                            (page - 1) * POSTS_ON_PAGE:page * POSTS_ON_PAGE
+                        ]
+                    )
+
+    def test_post_detail_reads_archive(self):
+        post = Post.objects.order_by('pk').first()
+        self.archive()
+        url = reverse('posts:post_detail', args=[post.pk])
+        response = self.author.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['post'].text, post.text)
+        self.assertNotContains(
+            response, reverse('posts:post_edit', args=[post.pk])
+        )
+        self.assertEqual(
+            self.guest.get(reverse('posts:post_detail', args=[0])).status_code,
+            404
+        )
+
+    def test_cursor_pages_continue_into_archive(self):
+        feed_ids = self.feed_ids()
+        self.archive()
+        for url in [PROFILE_URL, GROUP_LIST_URL]:
+            with self.subTest(url=url):
+                pages = [self.guest.get(url, {'cursor': ''}).context[
+                    'page_obj'
+                ]]
+                while pages[-1].has_next():
+                    pages.append(self.guest.get(url, {
+                        'cursor': pages[-1].next_cursor()
+                    }).context['page_obj'])
+                self.assertEqual(
+                    [post.pk for page in pages for post in page], feed_ids
+                )
+                previous = self.guest.get(url, {
+                    'cursor': pages[-1].previous_cursor()
+                }).context['page_obj']
+                self.assertEqual(
+                    [post.pk for post in previous],
+                    [post.pk for post in pages[-2]]
+                )
+
+    def test_api_reads_archive(self):
+        feed_ids = self.feed_ids()
+        self.archive()
+        ids = []
+        url = API_PROFILE_URL
+        while url:
+            data = self.guest.get(url).json()
+            ids += [post['id'] for post in data['results']]
+            url = data['next']
+        self.assertEqual(ids, feed_ids)
+        streamed = json.loads(b''.join(
+            self.guest.get(API_PROFILE_URL, {'all': 1}).streaming_content
+        ))
+        self.assertEqual([post['id'] for post in streamed], feed_ids)
+        self.assertEqual(self.guest.get(reverse(
+            'posts:api_post_detail', args=[feed_ids[-1]]
+        )).status_code, 200)
+
+    def test_export_includes_archive(self):
+        ids = sorted(self.feed_ids())
+        self.archive()
+        with tempfile.NamedTemporaryFile(
+                suffix='.jsonl', delete=False) as file:
+            pass
+        self.addCleanup(os.remove, file.name)
+        call_command('export_posts', file.name, stderr=StringIO())
+        with open(file.name, encoding='utf-8') as file:
+            rows = [json.loads(line) for line in file]
+        self.assertEqual([row['id'] for row in rows], ids)
+
+    def test_deleting_archived_post_updates_counters(self):
+        self.archive()
+        ArchivedPost.objects.first().delete()
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, OLD_COUNT + NEW_COUNT - 1)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).posts_count,
+            OLD_COUNT + NEW_COUNT - 1
+        )
+
+    def test_profile_without_stats_counts_archive(self):
+        self.archive()
+        AuthorStats.objects.filter(author=self.user).delete()
+        page_obj = self.guest.get(PROFILE_URL).context['page_obj']
+        self.assertEqual(page_obj.paginator.count, OLD_COUNT + NEW_COUNT)
+
+    def test_nothing_cascades_to_post(self):
+        # Архив удаляет посты мимо каскада: ссылок на Post быть не должно.
+        self.assertFalse(Post._meta.related_objects)
@@ -0,0 +1,226 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.cache import (
+    POSTS_COUNT_FRESH_KEY, get_versions, page_version_key, posts_count
+)
+from posts.models import Group, Post, User
+from posts.timelines import load_timeline
+from yatube.settings import POSTS_ON_PAGE
+
+USERNAME = 'UserAuthor'
+GROUP_SLUG = 'test_slug'
+GROUP_SLUG_OTHER = 'test_slug_other'
+GROUP_DESCRIPTION_NEW = 'Новое описание группы'
+POST_TEXT = 'Текст поста'
+POST_TEXT_NEW = 'Новый текст поста'
+
+INDEX_URL = reverse('posts:index')
+GROUP_LIST_URL = reverse('posts:group_list', args=[GROUP_SLUG])
+GROUP_LIST_URL_OTHER = reverse('posts:group_list', args=[GROUP_SLUG_OTHER])
+PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+CREATE_POST_URL = reverse('posts:post_create')
+
+
+# Сигналы правят кэш после фиксации транзакции, а TestCase её не делает.
+run_on_commit = mock.patch(
+    'django.db.transaction.on_commit', new=lambda func: func()
+)
+
+
+@run_on_commit
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username=USERNAME, first_name='Имя', last_name='Фамилия'
+        )
+        cls.group = Group.objects.create(
+            title='Группа1', slug=GROUP_SLUG, description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text=POST_TEXT, author=cls.user, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def assertCards(self, text, present=True):
+        for url in [INDEX_URL, GROUP_LIST_URL, PROFILE_URL]:
+            with self.subTest(url=url, text=text):
+                content = self.client.get(url).content.decode()
+                self.assertEqual(text in content, present)
+
+    def test_cards_are_served_from_cache(self):
+        self.assertCards(POST_TEXT)
+        Post.objects.filter(pk=self.post.pk).update(text=POST_TEXT_NEW)
+        self.assertCards(POST_TEXT)
+
+    def test_post_save_invalidates_card(self):
+        self.assertCards(POST_TEXT)
+        self.post.text = POST_TEXT_NEW
+        self.post.save()
+        self.assertCards(POST_TEXT_NEW)
+
+    def test_group_and_author_changes_invalidate_card(self):
+        self.assertCards(POST_TEXT)
+        self.group.title = 'Переименованная группа'
+        self.group.save()
+        content = self.client.get(INDEX_URL).content.decode()
+        self.assertIn('Переименованная группа', content)
+        self.user.first_name = 'Другое'
+        self.user.save()
+        for url in [INDEX_URL, GROUP_LIST_URL, PROFILE_URL]:
+            with self.subTest(url=url):
+                content = self.client.get(url).content.decode()
+                self.assertIn('Другое Фамилия', content)
+
+
+@run_on_commit
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Группа1', slug=GROUP_SLUG, description='Описание'
+        )
+        cls.group_other = Group.objects.create(
+            title='Группа2', slug=GROUP_SLUG_OTHER, description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text=POST_TEXT, author=cls.user, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.author = Client()
+        self.author.force_login(self.user)
+
+    def test_anonymous_pages_are_cached(self):
+        # Группе и профилю нужен один запрос на ETag.
+        for url, queries in [
+            [INDEX_URL, 0], [GROUP_LIST_URL, 1], [PROFILE_URL, 1]
+        ]:
+            with self.subTest(url=url):
+                self.guest.get(url)
+                with self.assertNumQueries(queries):
+                    self.assertEqual(self.guest.get(url).status_code, 200)
+
+    def test_create_purges_only_affected_pages(self):
+        for url in [INDEX_URL, GROUP_LIST_URL, GROUP_LIST_URL_OTHER]:
+            self.guest.get(url)
+        Group.objects.filter(pk=self.group.pk).update(
+            description=GROUP_DESCRIPTION_NEW
+        )
+        self.author.post(CREATE_POST_URL, data={
+            'text': POST_TEXT_NEW, 'group': self.group_other.pk,
+        })
+        for url in [INDEX_URL, GROUP_LIST_URL_OTHER, PROFILE_URL]:
+            with self.subTest(url=url):
+                self.assertContains(self.guest.get(url), POST_TEXT_NEW)
+        self.assertNotContains(
+            self.guest.get(GROUP_LIST_URL), GROUP_DESCRIPTION_NEW
+        )
+
+    def test_edit_purges_old_and_new_group(self):
+        for url in [GROUP_LIST_URL, GROUP_LIST_URL_OTHER]:
+            self.guest.get(url)
+        self.author.post(
+            reverse('posts:post_edit', args=[self.post.pk]),
+            data={'text': POST_TEXT_NEW, 'group': self.group_other.pk},
+        )
+        self.assertNotContains(self.guest.get(GROUP_LIST_URL), POST_TEXT)
+        self.assertContains(
+            self.guest.get(GROUP_LIST_URL_OTHER), POST_TEXT_NEW
+        )
+
+    def test_logged_in_user_bypasses_cache(self):
+        self.guest.get(GROUP_LIST_URL)
+        Group.objects.filter(pk=self.group.pk).update(
+            description=GROUP_DESCRIPTION_NEW
+        )
+        self.assertNotContains(
+            self.guest.get(GROUP_LIST_URL), GROUP_DESCRIPTION_NEW
+        )
+        self.assertContains(
+            self.author.get(GROUP_LIST_URL), GROUP_DESCRIPTION_NEW
+        )
+
+
+@run_on_commit
+class PostsCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+
+    def guest_page(self, url):
+        return self.guest.get(url).context['page_obj']
+
+    def test_index_does_not_count_posts_per_request(self):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.user)
+            for i in range(POSTS_ON_PAGE + 3)
+        )
+        page = self.guest_page(INDEX_URL)
+        self.assertTrue(page.has_next())
+        self.assertEqual(page.paginator.count, POSTS_ON_PAGE + 3)
+        Post.objects.create(text='Ещё пост', author=self.user)
+        with self.assertNumQueries(1):
+            page = self.guest_page(INDEX_URL + '?page=2')
+        self.assertEqual(page.paginator.count, POSTS_ON_PAGE + 4)
+        self.assertEqual(len(page), 4)
+        self.assertFalse(page.has_next())
+
+    def test_stale_count_is_refreshed_in_background(self):
+        self.assertEqual(posts_count(), 0)
+        Post.objects.bulk_create([Post(text='Пост', author=self.user)])
+        cache.delete(POSTS_COUNT_FRESH_KEY)
+        with mock.patch('posts.cache.threading.Thread') as thread:
+            self.assertEqual(posts_count(), 0)
+            self.assertEqual(posts_count(), 0)
+        thread.assert_called_once()
+        thread.call_args[1]['target']()
+        self.assertEqual(posts_count(), 1)
+
+
+class CommitOnlyTests(TestCase):
+    """Кэш меняется только после фиксации: откат его не трогает."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+
+    def test_rolled_back_write_leaves_cache(self):
+        keys = [
+            page_version_key('index'),
+            page_version_key(f'profile:{USERNAME}'),
+        ]
+        versions = get_versions(keys)
+        count = posts_count()
+        timeline = load_timeline()
+        with self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                Post.objects.create(text='Откаченный пост', author=self.user)
+                raise DatabaseError('database is locked')
+        self.assertEqual(get_versions(keys), versions)
+        self.assertEqual(posts_count(), count)
+        self.assertEqual(load_timeline(), timeline)
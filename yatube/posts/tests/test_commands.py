@@ -0,0 +1,180 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import AuthorStats, Group, Post, User
+from posts.management.commands.import_posts import BAD_LINES_SHOWN, BadLines
+
+USERNAME = 'UserAuthor'
+GROUP_SLUG = 'test_slug'
+PUB_DATE = '2020-01-02T03:04:05+00:00'
+
+
+class ImportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Группа1', slug=GROUP_SLUG, description='Описание'
+        )
+
+    def import_file(self, content, suffix, *args):
+        with tempfile.NamedTemporaryFile(
+                'w', suffix=suffix, delete=False, encoding='utf-8') as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        stderr = io.StringIO()
+        call_command(
+            'import_posts', file.name, *args,
+            stdout=io.StringIO(), stderr=stderr
+        )
+        return stderr.getvalue()
+
+    def test_import_jsonl(self):
+        rows = [
+            {'text': 'Пост 1', 'author': USERNAME, 'group': GROUP_SLUG,
+             'pub_date': PUB_DATE},
+            {'text': 'Пост 2', 'author': USERNAME},
+            {'text': 'Чужой автор', 'author': 'nobody'},
+            {'text': 'Чужая группа', 'author': USERNAME, 'group': 'none'},
+            {'text': 'Пост 3', 'author': USERNAME, 'pub_date': 'вчера'},
+        ]
+        self.import_file(
+            '\n'.join(json.dumps(row) for row in rows), '.jsonl',
+            '--batch-size', '2'
+        )
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            ['Пост 1', 'Пост 2']
+        )
+        post = Post.objects.get(text='Пост 1')
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(post.pub_date.isoformat(), PUB_DATE)
+        self.assertEqual(AuthorStats.objects.get().posts_count, 2)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+
+    def test_import_csv(self):
+        self.import_file(
+            'text,author,group,pub_date\n'
+            f'"Пост, с запятой",{USERNAME},{GROUP_SLUG},{PUB_DATE}\n'
+            f'Без группы,{USERNAME},,\n',
+            '.csv'
+        )
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', 'group__slug')),
+            [('Без группы', None), ('Пост, с запятой', GROUP_SLUG)]
+        )
+
+    def test_import_skips_malformed_lines(self):
+        lines = [
+            json.dumps({'text': 'Пост 1', 'author': USERNAME}),
+            '{"text": "оборвано',
+            json.dumps(['не', 'словарь']),
+            json.dumps({'text': 'Пост 2', 'author': [USERNAME]}),
+            json.dumps({'text': 'Пост 3', 'author': USERNAME}),
+        ]
+        stderr = self.import_file(
+            '\n'.join(lines), '.jsonl', '--batch-size', '1'
+        )
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            ['Пост 1', 'Пост 3']
+        )
+        self.assertIn('2, 3, 4', stderr)
+
+    def test_only_first_bad_lines_are_kept(self):
+        bad_lines = BadLines()
+        for number in range(1, BAD_LINES_SHOWN + 6):
+            bad_lines.add(number)
+        self.assertEqual(bad_lines.count, BAD_LINES_SHOWN + 5)
+        self.assertEqual(
+            bad_lines.shown, list(range(1, BAD_LINES_SHOWN + 1))
+        )
+        stderr = self.import_file('{\n' * (BAD_LINES_SHOWN + 5), '.jsonl')
+        self.assertIn(f', {BAD_LINES_SHOWN} и другие', stderr)
+
+
+class ExportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.other = User.objects.create_user(username='Other')
+        cls.group = Group.objects.create(
+            title='Группа1', slug=GROUP_SLUG, description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(text='Пост 1', author=cls.user),
+            Post.objects.create(
+                text='Пост, с запятой', author=cls.user, group=cls.group
+            ),
+            Post.objects.create(text='Чужой пост', author=cls.other),
+        ]
+
+    def export(self, suffix, *args, content=''):
+        with tempfile.NamedTemporaryFile(
+                'w', suffix=suffix, delete=False, encoding='utf-8') as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        call_command(
+            'export_posts', file.name, *args, stderr=io.StringIO()
+        )
+        with open(file.name, encoding='utf-8') as file:
+            return file.read()
+
+    def test_export_jsonl(self):
+        rows = [
+            json.loads(line)
+            for line in self.export('.jsonl', '--chunk-size', '2').splitlines()
+        ]
+        self.assertEqual(
+            [row['id'] for row in rows], [post.pk for post in self.posts]
+        )
+        self.assertEqual(rows[1]['author'], USERNAME)
+        self.assertEqual(rows[1]['group'], GROUP_SLUG)
+        self.assertIsNone(rows[0]['group'])
+
+    def test_export_csv_can_be_imported(self):
+        content = self.export('.csv', '--group', GROUP_SLUG)
+        self.assertTrue(content.startswith('id,text,pub_date,author,group'))
+        Post.objects.all().delete()
+        with tempfile.NamedTemporaryFile(
+                'w', suffix='.csv', delete=False, encoding='utf-8') as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        call_command('import_posts', file.name, stdout=io.StringIO())
+        self.assertEqual(
+            list(Post.objects.values_list('text', 'group__slug')),
+            [('Пост, с запятой', GROUP_SLUG)]
+        )
+
+    def test_csv_header_on_resume(self):
+        after_id = str(self.posts[0].pk)
+        first = self.export('.csv', '--until', '2000-01-01')
+        for content, headers in [('', 1), (first, 1)]:
+            with self.subTest(content=content):
+                lines = self.export(
+                    '.csv', '--after-id', after_id, content=content
+                ).splitlines()
+                self.assertEqual(lines.count(first.strip()), headers)
+                self.assertEqual(len(lines), headers + len(self.posts) - 1)
+
+    def test_filters_and_resume(self):
+        cases = [
+            (['--author', 'Other'], self.posts[2:]),
+            (['--after-id', str(self.posts[0].pk)], self.posts[1:]),
+            (['--since', '2000-01-01', '--until', '2000-01-02'], []),
+        ]
+        for args, posts in cases:
+            with self.subTest(args=args):
+                content = self.export('.jsonl', *args)
+                self.assertEqual(
+                    [json.loads(line)['id'] for line in content.splitlines()],
+                    [post.pk for post in posts]
+                )
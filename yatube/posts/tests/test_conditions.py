@@ -0,0 +1,102 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from posts.models import Group, Post, User
+
+USERNAME = 'UserAuthor'
+GROUP_SLUG = 'test_slug'
+POST_TEXT = 'Текст поста'
+POST_TEXT_NEW = 'Новый текст поста'
+
+GROUP_LIST_URL = reverse('posts:group_list', args=[GROUP_SLUG])
+PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Группа1', slug=GROUP_SLUG, description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text=POST_TEXT, author=cls.user, group=cls.group
+        )
+        cls.POST_DETAIL_URL = reverse('posts:post_detail', args=[cls.post.pk])
+        cls.POST_EDIT_URL = reverse('posts:post_edit', args=[cls.post.pk])
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.author = Client()
+        self.author.force_login(self.user)
+
+    def test_matching_etag_returns_not_modified(self):
+        for url in [self.POST_DETAIL_URL, PROFILE_URL, GROUP_LIST_URL]:
+            with self.subTest(url=url):
+                etag = self.guest.get(url)['ETag']
+                response = self.guest.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    def test_pages_have_no_last_modified(self):
+        newest = Post.objects.create(
+            text=POST_TEXT_NEW, author=self.user, group=self.group
+        )
+        urls = [self.POST_DETAIL_URL, PROFILE_URL, GROUP_LIST_URL]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertFalse(self.guest.get(url).has_header(
+                    'Last-Modified'
+                ))
+        # Автор переименован, а updated_at поста прежний.
+        self.user.first_name = 'Новое имя'
+        self.user.save()
+        newest.delete()
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.guest.get(
+                    url, HTTP_IF_MODIFIED_SINCE=http_date()
+                ).status_code, 200)
+
+    def test_not_modified_needs_one_query(self):
+        etag = self.guest.get(GROUP_LIST_URL)['ETag']
+        with self.assertNumQueries(1):
+            self.guest.get(GROUP_LIST_URL, HTTP_IF_NONE_MATCH=etag)
+
+    def test_edit_changes_validators(self):
+        for url in [self.POST_DETAIL_URL, PROFILE_URL, GROUP_LIST_URL]:
+            with self.subTest(url=url):
+                etag = self.guest.get(url)['ETag']
+                self.author.post(self.POST_EDIT_URL, data={
+                    'text': f'{POST_TEXT_NEW} {url}', 'group': self.group.pk
+                })
+                self.assertEqual(self.guest.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                ).status_code, 200)
+
+    def test_old_last_modified_returns_page(self):
+        self.assertEqual(self.guest.get(
+            self.POST_DETAIL_URL, HTTP_IF_MODIFIED_SINCE=http_date(0)
+        ).status_code, 200)
+
+    def test_etag_depends_on_user(self):
+        self.assertNotEqual(
+            self.guest.get(self.POST_DETAIL_URL)['ETag'],
+            self.author.get(self.POST_DETAIL_URL)['ETag'],
+        )
+        self.assertFalse(
+            self.author.get(self.POST_DETAIL_URL).has_header('Last-Modified')
+        )
+
+    def test_missing_pages_return_not_found(self):
+        for url in [
+            reverse('posts:post_detail', args=[self.post.pk + 100]),
+            reverse('posts:profile', args=['nobody']),
+            reverse('posts:group_list', args=['nothing']),
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(self.guest.get(url).status_code, 404)
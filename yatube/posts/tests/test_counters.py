@@ -0,0 +1,69 @@
+import os
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import AuthorStats, Group, Post, User
+
+USERNAME = 'UserAuthor'
+USERNAME_OTHER = 'UserOther'
+
+
+class PostCountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Группа1', slug='test_slug', description='Описание 1'
+        )
+        cls.group2 = Group.objects.create(
+            title='Группа2', slug='test_slug_new', description='Описание 2'
+        )
+
+    def assertCounts(self, author, group, group2):
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).posts_count, author
+        )
+        self.group.refresh_from_db()
+        self.group2.refresh_from_db()
+        self.assertEqual(self.group.posts_count, group)
+        self.assertEqual(self.group2.posts_count, group2)
+
+    def test_counters_follow_create_edit_delete(self):
+        post = Post.objects.create(
+            text='Пост', author=self.user, group=self.group
+        )
+        Post.objects.create(text='Пост без группы', author=self.user)
+        self.assertCounts(2, 1, 0)
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.group2
+        post.save()
+        self.assertCounts(2, 0, 1)
+        post.save()
+        self.assertCounts(2, 0, 1)
+        post.delete()
+        self.assertCounts(1, 0, 0)
+
+    def test_group_delete_and_author_cascade(self):
+        author = User.objects.create_user(username=USERNAME_OTHER)
+        group = Group.objects.create(
+            title='Группа3', slug='test_slug_other', description='Описание 3'
+        )
+        Post.objects.create(text='Пост', author=author, group=group)
+        Post.objects.create(text='Пост', author=author, group=self.group2)
+        group.delete()
+        self.assertEqual(Post.objects.filter(group=None).count(), 1)
+        author.delete()
+        self.group2.refresh_from_db()
+        self.assertEqual(self.group2.posts_count, 0)
+        self.assertFalse(AuthorStats.objects.exists())
+
+    def test_recount_posts_fixes_drift(self):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.user, group=self.group)
+            for i in range(3)
+        )
+        Group.objects.filter(pk=self.group2.pk).update(posts_count=5)
+        call_command('recount_posts', stdout=open(os.devnull, 'w'))
+        self.assertCounts(3, 3, 0)
@@ -0,0 +1,117 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+USERNAME = 'UserAuthor'
+GROUP_SLUG = 'test_slug'
+GROUP_SLUG_OTHER = 'test_slug_other'
+POST_TEXT = 'Текст поста'
+POST_TEXT_NEW = 'Новый текст поста'
+POST_TEXT_OTHER = 'Пост другой группы'
+
+INDEX_RSS_URL = reverse('posts:index_rss')
+INDEX_ATOM_URL = reverse('posts:index_atom')
+GROUP_RSS_URL = reverse('posts:group_rss', args=[GROUP_SLUG])
+GROUP_ATOM_URL = reverse('posts:group_atom', args=[GROUP_SLUG])
+GROUP_RSS_URL_OTHER = reverse('posts:group_rss', args=[GROUP_SLUG_OTHER])
+PROFILE_RSS_URL = reverse('posts:profile_rss', args=[USERNAME])
+PROFILE_ATOM_URL = reverse('posts:profile_atom', args=[USERNAME])
+FEED_URLS = [
+    INDEX_RSS_URL, INDEX_ATOM_URL, GROUP_RSS_URL, GROUP_ATOM_URL,
+    PROFILE_RSS_URL, PROFILE_ATOM_URL,
+]
+CREATE_POST_URL = reverse('posts:post_create')
+
+
+# Сигналы правят кэш после фиксации транзакции, а TestCase её не делает.
+run_on_commit = mock.patch(
+    'django.db.transaction.on_commit', new=lambda func: func()
+)
+
+
+@run_on_commit
+class PostFeedsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Группа1', slug=GROUP_SLUG, description='Описание'
+        )
+        cls.group_other = Group.objects.create(
+            title='Группа2', slug=GROUP_SLUG_OTHER, description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text=POST_TEXT, author=cls.user, group=cls.group
+        )
+        Post.objects.create(
+            text=POST_TEXT_OTHER, author=cls.user, group=cls.group_other
+        )
+        cls.POST_EDIT_URL = reverse('posts:post_edit', args=[cls.post.pk])
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.author = Client()
+        self.author.force_login(self.user)
+
+    def test_feeds_list_posts(self):
+        for url, content_type in [
+            [INDEX_RSS_URL, 'application/rss+xml'],
+            [INDEX_ATOM_URL, 'application/atom+xml'],
+            [GROUP_RSS_URL, 'application/rss+xml'],
+            [PROFILE_ATOM_URL, 'application/atom+xml'],
+        ]:
+            with self.subTest(url=url):
+                response = self.guest.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response['Content-Type'].startswith(
+                    content_type
+                ))
+                self.assertContains(response, POST_TEXT)
+
+    def test_group_feed_lists_only_group_posts(self):
+        self.assertNotContains(self.guest.get(GROUP_RSS_URL), POST_TEXT_OTHER)
+
+    def test_feeds_are_cached_and_not_modified(self):
+        for url in FEED_URLS:
+            with self.subTest(url=url):
+                etag = self.guest.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.guest.get(url).status_code, 200)
+                with self.assertNumQueries(0):
+                    response = self.guest.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_edit_purges_feeds(self):
+        etags = {url: self.guest.get(url)['ETag'] for url in FEED_URLS}
+        self.author.post(self.POST_EDIT_URL, data={
+            'text': POST_TEXT_NEW, 'group': self.group.pk
+        })
+        for url in FEED_URLS:
+            with self.subTest(url=url):
+                response = self.guest.get(url, HTTP_IF_NONE_MATCH=etags[url])
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, POST_TEXT_NEW)
+
+    def test_create_keeps_other_group_feed(self):
+        etag = self.guest.get(GROUP_RSS_URL_OTHER)['ETag']
+        self.author.post(CREATE_POST_URL, data={
+            'text': POST_TEXT_NEW, 'group': self.group.pk
+        })
+        self.assertEqual(self.guest.get(
+            GROUP_RSS_URL_OTHER, HTTP_IF_NONE_MATCH=etag
+        ).status_code, 304)
+        self.assertContains(self.guest.get(GROUP_RSS_URL), POST_TEXT_NEW)
+
+    def test_missing_feeds_return_not_found(self):
+        for url in [
+            reverse('posts:group_rss', args=['nothing']),
+            reverse('posts:profile_atom', args=['nobody']),
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(self.guest.get(url).status_code, 404)
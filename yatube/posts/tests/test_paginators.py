@@ -0,0 +1,26 @@
+from django.core.paginator import Paginator
+from django.test import TestCase
+
+from posts.paginators import elided_page_range
+
+PAGES = 1000
+
+
+class ElidedPageRangeTests(TestCase):
+    def page_range(self, number):
+        return elided_page_range(Paginator(range(PAGES), 1).page(number))
+
+    def test_elided_page_range(self):
+        cases = [
+            [1, [1, 2, 3, None, PAGES]],
+            [4, [1, 2, 3, 4, 5, 6, None, PAGES]],
+            [500, [1, None, 498, 499, 500, 501, 502, None, PAGES]],
+            [PAGES, [1, None, PAGES - 2, PAGES - 1, PAGES]],
+        ]
+        for number, page_range in cases:
+            with self.subTest(number=number):
+                self.assertEqual(self.page_range(number), page_range)
+
+    def test_short_feed_is_not_elided(self):
+        page = Paginator(range(3), 1).page(2)
+        self.assertEqual(elided_page_range(page), [1, 2, 3])
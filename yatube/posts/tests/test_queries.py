@@ -0,0 +1,100 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+USERNAME = 'UserAuthor'
+USERNAME_OTHER = 'UserOther'
+GROUP_SLUG = 'test_slug'
+GROUP_SLUG_OTHER = 'test_slug_other'
+FEED_SIZES = [10, 100, 1000]
+
+
+class QueryBudgetTests(TestCase):
+    """Число запросов к БД на страницах posts: не зависит от объёма ленты."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username=USERNAME, first_name='Имя', last_name='Фамилия'
+        )
+        cls.user_other = User.objects.create_user(username=USERNAME_OTHER)
+        cls.group = Group.objects.create(
+            title='Группа1', slug=GROUP_SLUG, description='Описание 1'
+        )
+        cls.group_other = Group.objects.create(
+            title='Группа2', slug=GROUP_SLUG_OTHER, description='Описание 2'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.author = Client()
+        self.author.force_login(self.user)
+
+    def fill_feed(self, size):
+        # bulk_create не шлёт сигналов: кэш страниц сбрасываем вручную,
+        # а счётчики постов пересчитываем командой.
+        cache.clear()
+        Post.objects.all().delete()
+        authors = [self.user, self.user_other]
+        groups = [self.group, self.group_other, None]
+        Post.objects.bulk_create(
+            Post(
+                text=f'Пост {i}',
+                author=authors[i % len(authors)],
+                group=groups[i % len(groups)],
+            )
+            for i in range(size)
+        )
+        call_command('recount_posts', stdout=StringIO())
+        return Post.objects.filter(author=self.user).latest('pk')
+
+    def budgets(self, post):
+        # [url, клиент, предельное число запросов]
+        return [
+            [reverse('posts:index'), self.guest, 2],
+            # Несуществующая страница: выборка, число постов и страница 1.
+            [reverse('posts:index') + '?page=2', self.guest, 3],
+            [reverse('posts:index') + '?cursor=', self.guest, 1],
+            # Группа, профиль и пост: ещё запрос на валидаторы (ETag).
+            [reverse('posts:group_list', args=[GROUP_SLUG]), self.guest, 4],
+            [reverse('posts:profile', args=[USERNAME]), self.guest, 4],
+            [reverse('posts:post_detail', args=[post.pk]), self.guest, 2],
+            [reverse('posts:post_create'), self.author, 3],
+            [reverse('posts:post_edit', args=[post.pk]), self.author, 4],
+            # Поиск: число совпадений, id из FTS и сами посты.
+            [reverse('posts:search') + '?q=Пост', self.guest, 3],
+            # Ленты RSS/Atom: выборка и, для группы и автора, их запись.
+            [reverse('posts:index_rss'), self.guest, 1],
+            [reverse('posts:index_atom'), self.guest, 1],
+            [reverse('posts:group_rss', args=[GROUP_SLUG]), self.guest, 2],
+            [reverse('posts:profile_atom', args=[USERNAME]), self.guest, 2],
+            [reverse('posts:api_post_list'), self.guest, 1],
+            [
+                reverse('posts:api_post_detail', args=[post.pk]),
+                self.guest, 1
+            ],
+            # Группа или автор, посты и, если их не хватило, архив.
+            [
+                reverse('posts:api_group_list', args=[GROUP_SLUG]),
+                self.guest, 3
+            ],
+            [reverse('posts:api_profile', args=[USERNAME]), self.guest, 3],
+        ]
+
+    def test_views_stay_within_query_budget(self):
+        for size in FEED_SIZES:
+            post = self.fill_feed(size)
+            for url, client, budget in self.budgets(post):
+                with self.subTest(size=size, url=url):
+                    with CaptureQueriesContext(connection) as queries:
+                        self.assertEqual(client.get(url).status_code, 200)
+                    self.assertLessEqual(len(queries), budget)
@@ -0,0 +1,77 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.template import Context, Template
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, User
+
+USERNAME = 'UserAuthor'
+LONG_TEXT = '\n\n'.join(
+    f'Абзац {i} <b>с разметкой</b>\nи переносом ' + 'слово ' * 20
+    for i in range(5)
+)
+NEW_TEXT = 'Короткий\nтекст'
+FILTERS = {
+    'text_html': '{{ text|linebreaks }}',
+    'excerpt_html': '{{ text|linebreaksbr|truncatewords:30 }}',
+    # short_text — обычный текст: экранирует его шаблон при выводе.
+    'short_text': (
+        '{% autoescape off %}{{ text|truncatechars:30 }}{% endautoescape %}'
+    ),
+}
+FEED_URLS = [
+    reverse('posts:index'),
+    reverse('posts:profile', args=[USERNAME]),
+]
+
+
+def rendered(text):
+    """Что давали фильтры шаблонов, когда разметки ещё не хранили."""
+    return {
+        field: Template(source).render(Context({'text': text}))
+        for field, source in FILTERS.items()
+    }
+
+
+class RenderedTextTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.post = Post.objects.create(text=LONG_TEXT, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+
+    def stored(self, pk):
+        return dict(zip(FILTERS, Post.objects.filter(pk=pk).values_list(
+            *FILTERS
+        ).get()))
+
+    def test_save_matches_template_filters(self):
+        self.assertEqual(self.stored(self.post.pk), rendered(LONG_TEXT))
+        self.post.text = NEW_TEXT
+        self.post.save(update_fields=['text'])
+        self.assertEqual(self.stored(self.post.pk), rendered(NEW_TEXT))
+
+    def test_backfill_command(self):
+        Post.objects.update(text_html='', excerpt_html='', short_text='')
+        call_command('render_posts', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(self.stored(self.post.pk), rendered(LONG_TEXT))
+
+    def test_feeds_do_not_load_full_text(self):
+        for url in FEED_URLS:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.guest.get(url)
+                self.assertContains(response, 'Абзац 0 &lt;b&gt;')
+                self.assertFalse([
+                    query for query in queries
+                    if '"posts_post"."text",' in query['sql']
+                ])
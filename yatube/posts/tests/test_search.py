@@ -0,0 +1,66 @@
+from django.contrib.admin.sites import site
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from posts.models import Post, User
+
+USERNAME = 'UserAuthor'
+SEARCH_URL = reverse('posts:search')
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.post_once = Post.objects.create(
+            text='Дедлайн близко, а код не готов', author=cls.user
+        )
+        cls.post_twice = Post.objects.create(
+            text='Дедлайн! Снова дедлайн и никаких тестов', author=cls.user
+        )
+        cls.post_other = Post.objects.create(
+            text='Про котиков', author=cls.user
+        )
+
+    def setUp(self):
+        self.guest = Client()
+
+    def search(self, query):
+        response = self.guest.get(SEARCH_URL, {'q': query})
+        return list(response.context['page_obj'])
+
+    def test_search_is_ranked(self):
+        self.assertEqual(
+            self.search('дедлайн'), [self.post_twice, self.post_once]
+        )
+        self.assertEqual(self.search('дедлайн код'), [self.post_once])
+        self.assertEqual(self.search(''), [])
+        self.assertEqual(self.search('"*'), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.post_other.text = 'Котики и дедлайн'
+        self.post_other.save()
+        self.assertIn(self.post_other, self.search('дедлайн'))
+        self.assertEqual(self.search('котиков'), [])
+        Post.objects.filter(pk=self.post_twice.pk).delete()
+        self.assertEqual(
+            self.search('дедлайн'), [self.post_other, self.post_once]
+        )
+
+    def test_search_is_paginated(self):
+        Post.objects.bulk_create(
+            Post(text=f'Массовый пост {i}', author=self.user)
+            for i in range(15)
+        )
+        response = self.guest.get(SEARCH_URL, {'q': 'массовый', 'page': 2})
+        self.assertEqual(len(response.context['page_obj']), 5)
+        self.assertEqual(response.context['page_obj'].paginator.count, 15)
+
+    def test_admin_search_uses_index(self):
+        model_admin = site._registry[Post]
+        queryset, use_distinct = model_admin.get_search_results(
+            RequestFactory().get('/'), Post.objects.all(), 'котиков'
+        )
+        self.assertEqual(list(queryset), [self.post_other])
+        self.assertFalse(use_distinct)
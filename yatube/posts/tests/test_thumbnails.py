@@ -0,0 +1,97 @@
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from posts.thumbnails import SIZES, BackgroundThumbnailBackend, generate
+
+USERNAME = 'UserAuthor'
+POST_TEXT = 'Пост с картинкой'
+CREATE_POST_URL = reverse('posts:post_create')
+INDEX_URL = reverse('posts:index')
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.author = Client()
+        self.author.force_login(self.user)
+
+    def create_post(self):
+        self.author.post(CREATE_POST_URL, data={
+            'text': POST_TEXT,
+            'image': SimpleUploadedFile(
+                'small.gif', SMALL_GIF, content_type='image/gif'
+            ),
+        })
+        return Post.objects.get(text=POST_TEXT)
+
+    def thumbnail(self, post):
+        geometry, options = SIZES[0]
+        return BackgroundThumbnailBackend().cached_thumbnail(
+            post.image, geometry, **options
+        )
+
+    def test_create_post_with_image(self):
+        post = self.create_post()
+        self.assertTrue(post.image.name.startswith('posts/small'))
+
+    @mock.patch('posts.thumbnails.schedule')
+    def test_feed_does_not_resize_images(self, schedule):
+        post = self.create_post()
+        response = self.guest.get(INDEX_URL)
+        self.assertContains(response, post.image.url)
+        self.assertIsNone(self.thumbnail(post))
+        schedule.assert_called_once()
+
+    @mock.patch('posts.thumbnails.connection')
+    @mock.patch('posts.thumbnails.schedule')
+    def test_generated_thumbnail_replaces_cached_original(self, schedule,
+                                                          connection):
+        post = self.create_post()
+        self.assertContains(self.guest.get(INDEX_URL), post.image.url)
+        task = schedule.call_args[0]
+        self.assertEqual(task[3], [(Post, post.pk)])
+        generate(*task)
+        response = self.guest.get(INDEX_URL)
+        self.assertContains(response, self.thumbnail(post).url)
+        self.assertNotContains(response, post.image.url)
+        # Миниатюра уже есть: ни нарезки, ни поиска постов в базе.
+        with self.assertNumQueries(0):
+            generate(*task)
+
+    def test_backfill_command_generates_thumbnails(self):
+        post = self.create_post()
+        call_command('generate_thumbnails', stdout=StringIO())
+        thumbnail = self.thumbnail(post)
+        self.assertIsNotNone(thumbnail)
+        self.assertContains(self.guest.get(INDEX_URL), thumbnail.url)
@@ -0,0 +1,149 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.timelines import (
+    add_post, changing, load_timeline, remove_post, timeline_key
+)
+from yatube.settings import POSTS_ON_PAGE
+
+USERNAME = 'UserAuthor'
+GROUP_SLUG = 'test_slug'
+GROUP_SLUG_OTHER = 'test_slug_other'
+POSTS_COUNT = POSTS_ON_PAGE + 5
+WINDOW_SIZE = 3
+
+INDEX_URL = reverse('posts:index')
+GROUP_LIST_URL = reverse('posts:group_list', args=[GROUP_SLUG])
+CREATE_POST_URL = reverse('posts:post_create')
+
+
+def timeline_ids(group_id=None):
+    return [pk for _, pk in load_timeline(group_id)['entries']]
+
+
+# Сигналы правят кэш после фиксации транзакции, а TestCase её не делает.
+run_on_commit = mock.patch(
+    'django.db.transaction.on_commit', new=lambda func: func()
+)
+
+
+@run_on_commit
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Группа1', slug=GROUP_SLUG, description='Описание'
+        )
+        cls.group_other = Group.objects.create(
+            title='Группа2', slug=GROUP_SLUG_OTHER, description='Описание'
+        )
+        for i in range(POSTS_COUNT):
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.user, group=cls.group
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.author = Client()
+        self.author.force_login(self.user)
+
+    def feed_ids(self, posts):
+        return list(
+            posts.order_by('-pub_date', '-pk').values_list('pk', flat=True)
+        )
+
+    def test_timelines_follow_database_order(self):
+        self.assertEqual(timeline_ids(), self.feed_ids(Post.objects.all()))
+        self.assertEqual(
+            timeline_ids(self.group.pk), self.feed_ids(self.group.posts)
+        )
+
+    def test_create_edit_and_delete_update_timelines(self):
+        timeline_ids()
+        timeline_ids(self.group.pk)
+        timeline_ids(self.group_other.pk)
+        self.author.post(CREATE_POST_URL, data={
+            'text': 'Новый пост', 'group': self.group.pk
+        })
+        post = Post.objects.latest('pk')
+        self.assertEqual(timeline_ids()[0], post.pk)
+        self.assertEqual(timeline_ids(self.group.pk)[0], post.pk)
+        self.author.post(
+            reverse('posts:post_edit', args=[post.pk]),
+            data={'text': 'Новый пост', 'group': self.group_other.pk}
+        )
+        self.assertNotIn(post.pk, timeline_ids(self.group.pk))
+        self.assertEqual(timeline_ids(self.group_other.pk), [post.pk])
+        post.delete()
+        for group_id in [None, self.group.pk, self.group_other.pk]:
+            with self.subTest(group_id=group_id):
+                self.assertNotIn(post.pk, timeline_ids(group_id))
+
+    @mock.patch('posts.timelines.TIMELINE_SIZE', WINDOW_SIZE)
+    def test_pages_beyond_window_read_database(self):
+        self.assertEqual(len(timeline_ids()), WINDOW_SIZE)
+        for url in [INDEX_URL, GROUP_LIST_URL]:
+            for page in [1, 2]:
+                with self.subTest(url=url, page=page):
+                    response = self.author.get(url, {'page': page})
+                    self.assertEqual(
+                        [post.pk for post in response.context['page_obj']],
+                        self.feed_ids(Post.objects.all())[
+                            (page - 1) * POSTS_ON_PAGE:page * POSTS_ON_PAGE
+                        ]
+                    )
+
+    def test_rebuild_command(self):
+        call_command('rebuild_timelines', stdout=StringIO())
+        for group_id in [None, self.group.pk, self.group_other.pk]:
+            with self.subTest(group_id=group_id):
+                self.assertIsNotNone(cache.get(timeline_key(group_id)))
+
+    def test_concurrent_writer_is_not_overwritten(self):
+        removed, kept = self.feed_ids(self.group.posts)[:2]
+        timeline_ids(self.group.pk)
+        with changing(self.group.pk) as timeline:
+            # Второй писатель приходит, пока первый держит блокировку.
+            remove_post(removed, self.group.pk)
+            timeline['entries'] = [
+                entry for entry in timeline['entries'] if entry[1] != kept
+            ]
+        self.assertIsNone(cache.get(timeline_key(self.group.pk)))
+        self.assertIn(removed, timeline_ids(self.group.pk))
+
+    def test_writer_after_race_keeps_timeline(self):
+        post = Post.objects.filter(group=self.group).latest('pk')
+        timeline_ids(self.group.pk)
+        with changing(self.group.pk):
+            remove_post(post.pk, self.group.pk)
+        timeline_ids(self.group.pk)
+        remove_post(post.pk, self.group.pk)
+        self.assertNotIn(post.pk, timeline_ids(self.group.pk))
+        add_post(post, self.group.pk)
+        self.assertIsNotNone(cache.get(timeline_key(self.group.pk)))
+
+    def test_post_committed_during_build_is_not_lost(self):
+        store = cache.set
+        created = []
+
+        def write_before_store(key, *args, **kwargs):
+            # Пост фиксируется между SELECT читателя и записью списка.
+            if key == timeline_key() and not created:
+                created.append(Post.objects.create(
+                    text='Новый пост', author=self.user
+                ))
+            return store(key, *args, **kwargs)
+
+        with mock.patch(
+                'posts.timelines.cache.set', side_effect=write_before_store):
+            load_timeline()
+        self.assertEqual(timeline_ids()[0], created[0].pk)
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 from posts.models import Post, Group, User
@@ -43,6 +44,7 @@ class PostURLTests(TestCase):
         cls.POST_EDIT_REDIRECT = f'{LOGIN_URL}?next={cls.POST_EDIT_URL}'
 
     def setUp(self):
+        cache.clear()
         self.guest = Client()
         self.another = Client()
         self.another.force_login(self.user2)
@@ -1,8 +1,10 @@
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
 from yatube.settings import POSTS_ON_PAGE
 from posts.models import Group, Post, User
+from posts.paginators import NEXT, encode_cursor
 
 GROUP_TITLE = 'Группа1'
 GROUP_SLUG = 'test_slug'
@@ -15,6 +17,7 @@ GROUP_LIST_URL = reverse('posts:group_list', args=[GROUP_SLUG])
 PROFILE_URL = reverse('posts:profile', args=[USERNAME])
 POSTS_ON_OTHER_PAGE = 3
 SECOND_PAGE = '?page=2'
+FIRST_CURSOR = '?cursor='
 
 GROUP_TITLE_OTHER = 'Другая группа'
 GROUP_SLUG_OTHER = 'test_slug_other'
@@ -45,6 +48,7 @@ class PostPagesTests(TestCase):
         cls.POST_DETAIL_URL = reverse('posts:post_detail', args=[cls.post.id])
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
@@ -111,3 +115,37 @@ class PostPagesTests(TestCase):
             with self.subTest(page=page):
                 response = self.guest_client.get(page)
                 self.assertEqual(len(response.context['page_obj']), records)
+
+    def test_cursor_paginator_on_pages(self):
+        Post.objects.all().delete()
+        Post.objects.bulk_create(
+            Post(text=f'Post {i}', author=self.user, group=self.group)
+            for i in range(POSTS_ON_PAGE + POSTS_ON_OTHER_PAGE)
+        )
+        for url in [INDEX_URL, GROUP_LIST_URL, PROFILE_URL]:
+            with self.subTest(url=url):
+                first = self.guest_client.get(url + FIRST_CURSOR)
+                first_page = first.context['page_obj']
+                self.assertEqual(len(first_page), POSTS_ON_PAGE)
+                self.assertFalse(first_page.has_previous())
+                second_page = self.guest_client.get(
+                    f'{url}?cursor={first_page.next_cursor()}'
+                ).context['page_obj']
+                self.assertEqual(len(second_page), POSTS_ON_OTHER_PAGE)
+                self.assertFalse(second_page.has_next())
+                self.assertFalse(
+                    set(first_page) & set(second_page)
+                )
+                back = self.guest_client.get(
+                    f'{url}?cursor={second_page.previous_cursor()}'
+                ).context['page_obj']
+                self.assertEqual(list(back), list(first_page))
+
+    def test_cursor_past_the_end_gives_first_page(self):
+        oldest = Post.objects.order_by('pub_date', 'pk').first()
+        cursor = encode_cursor(NEXT, oldest)
+        for url in [INDEX_URL, GROUP_LIST_URL, PROFILE_URL]:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.context['page_obj'].has_previous())
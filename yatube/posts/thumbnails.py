@@ -0,0 +1,178 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import connection
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.kvstores.base import KVStoreBase
+
+from .cache import bump_versions, feed_scopes, purge_pages, version_key
+from yatube.settings import THUMBNAIL_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Миниатюры из шаблонов ленты и страницы поста: {% thumbnail post.image %}.
+SIZES = [
+    ('960x339', {'crop': 'center', 'upscale': True}),
+]
+
+_executor = None
+_lock = threading.Lock()
+_pending = set()
+
+
+class CacheKVStore(KVStoreBase):
+    """
+    Сведения sorl о миниатюрах только в кэше, без таблицы в БД.
+
+    Потерянный ключ восстанавливается по уже нарезанному файлу
+    без повторной нарезки.
+    """
+
+    def _get_raw(self, key):
+        return cache.get(key)
+
+    def _set_raw(self, key, value):
+        cache.set(key, value, None)
+
+    def _delete_raw(self, *keys):
+        cache.delete_many(keys)
+
+    def _find_keys_raw(self, prefix):
+        # Кэш не перечисляет ключи: команды thumbnail cleanup/clear
+        # здесь ничего не находят.
+        return []
+
+
+class BackgroundThumbnailBackend(ThumbnailBackend):
+    """
+    Не режет картинки во время отрисовки страницы.
+
+    Готовую миниатюру берёт из хранилища ключей sorl, а вместо
+    недостающей отдаёт оригинал и ставит миниатюру в очередь пула.
+    """
+
+    def thumbnail_options(self, source, options):
+        # Те же умолчания, что в ThumbnailBackend.get_thumbnail: от них
+        # зависит имя файла миниатюры.
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        return options
+
+    def cached_thumbnail(self, file_, geometry_string, **options):
+        source = ImageFile(file_)
+        name = self._get_thumbnail_filename(
+            source, geometry_string, self.thumbnail_options(source, options)
+        )
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        if not file_:
+            raise ValueError('falsey file_ argument in get_thumbnail()')
+        thumbnail = self.cached_thumbnail(file_, geometry_string, **options)
+        if thumbnail is not None:
+            return thumbnail
+        # {% thumbnail post.image %} передаёт поле картинки, а с ним и пост.
+        post = getattr(file_, 'instance', None)
+        schedule(
+            getattr(file_, 'name', file_), geometry_string, options,
+            [] if post is None else [(type(post), post.pk)]
+        )
+        return ImageFile(file_)
+
+    def generate(self, file_, geometry_string, **options):
+        return super().get_thumbnail(file_, geometry_string, **options)
+
+
+def task_key(name, geometry_string, options):
+    return name, geometry_string, tuple(sorted(options.items()))
+
+
+def refresh_pages(posts):
+    """
+    Сбрасывает карточки и страницы постов posts — пар (модель, id).
+
+    Пока миниатюры не было, в кэш карточек и страниц попал оригинал.
+    """
+    for model, pk in posts:
+        post = model.objects.select_related('author').filter(pk=pk).first()
+        if post is not None:
+            bump_versions(version_key('post', post.pk))
+            purge_pages(*feed_scopes(post, post.group_id))
+
+
+def make(name, geometry_string, options):
+    """Режет миниатюру; False, если она уже была и резать нечего."""
+    if default.backend.cached_thumbnail(
+            name, geometry_string, **options) is not None:
+        return False
+    default.backend.generate(name, geometry_string, **options)
+    return True
+
+
+def generate(name, geometry_string, options, posts=()):
+    try:
+        if make(name, geometry_string, options):
+            refresh_pages(posts)
+    except Exception:
+        logger.exception('Не удалось сделать миниатюру %s', name)
+    finally:
+        with _lock:
+            _pending.discard(task_key(name, geometry_string, options))
+        # Поток пула живёт долго: соединение с БД ему держать незачем.
+        connection.close()
+
+
+def schedule(name, geometry_string, options, posts=()):
+    """
+    Отдаёт миниатюру пулу потоков, если её ещё не делают.
+
+    posts — пары (модель, id) постов с этой картинкой: их страницы
+    сбрасываются, когда миниатюра готова.
+    """
+    global _executor
+    key = task_key(name, geometry_string, options)
+    with _lock:
+        if key in _pending:
+            return
+        _pending.add(key)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                THUMBNAIL_WORKERS, thread_name_prefix='thumbnails'
+            )
+    _executor.submit(generate, name, geometry_string, options, posts)
+
+
+def wait():
+    """Дожидается миниатюр, уже отданных пулу."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def schedule_thumbnails(name, posts=()):
+    for geometry_string, options in SIZES:
+        schedule(name, geometry_string, dict(options), posts)
+
+
+def generate_thumbnails(name, posts=()):
+    """Делает все миниатюры картинки сразу, в текущем потоке."""
+    made = [
+        make(name, geometry_string, dict(options))
+        for geometry_string, options in SIZES
+    ]
+    if any(made):
+        refresh_pages(posts)
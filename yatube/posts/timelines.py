@@ -0,0 +1,187 @@
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.utils.functional import cached_property
+
+from .models import Group, Post
+from core.routers import DEFAULT
+from yatube.settings import TIMELINE_SIZE
+
+INDEX = 'index'
+LOCK_TIMEOUT = 5
+
+
+def timeline_key(group_id=None):
+    return 'timeline:' + (INDEX if group_id is None else f'group:{group_id}')
+
+
+def generation_key(key):
+    return f'{key}:generation'
+
+
+def generation(key):
+    """Счётчик правок списка key; меняет его каждый писатель."""
+    cache.add(generation_key(key), 0, None)
+    return cache.get(generation_key(key))
+
+
+def next_generation(key):
+    cache.add(generation_key(key), 0, None)
+    try:
+        return cache.incr(generation_key(key))
+    except ValueError:
+        # Ключ вытеснен между add и incr: сверка поколений не совпадёт.
+        return None
+
+
+def store(key, timeline, seen):
+    """
+    Кладёт список в кэш, если с поколения seen его никто не правил.
+
+    Поколение сверяется после записи: писатель, сменивший его раньше,
+    заметен здесь, а сменивший позже уже видит наш список и правит его.
+    """
+    cache.set(key, timeline, None)
+    if seen is None or cache.get(generation_key(key)) != seen:
+        cache.delete(key)
+
+
+def build_timeline(group_id=None):
+    """
+    Последние TIMELINE_SIZE постов ленты: [(pub_date, id)] по убыванию.
+
+    complete — в ленте не больше постов, чем в списке, и за его пределами
+    искать нечего. Список читается из основной базы: собранный по
+    отстающей реплике, он остался бы в кэше без срока.
+    """
+    key = timeline_key(group_id)
+    seen = generation(key)
+    posts = Post.objects.using(DEFAULT).all()
+    if group_id is not None:
+        posts = posts.filter(group_id=group_id)
+    entries = list(
+        posts.order_by('-pub_date', '-pk')
+        .values_list('pub_date', 'pk')[:TIMELINE_SIZE + 1]
+    )
+    timeline = {
+        'entries': entries[:TIMELINE_SIZE],
+        'complete': len(entries) <= TIMELINE_SIZE,
+    }
+    # Пост, зафиксированный между SELECT и записью, не попал в список,
+    # а его add_post списка ещё не нашёл: такой список не сохраняем.
+    store(key, timeline, seen)
+    return timeline
+
+
+def load_timeline(group_id=None):
+    timeline = cache.get(timeline_key(group_id))
+    if timeline is None:
+        return build_timeline(group_id)
+    return timeline
+
+
+def rebuild_timelines():
+    group_ids = list(Group.objects.values_list('pk', flat=True))
+    for group_id in [None] + group_ids:
+        build_timeline(group_id)
+    return len(group_ids)
+
+
+@contextmanager
+def changing(group_id):
+    """
+    Отдаёт список для правки или None, если его нет в кэше.
+
+    Каждый писатель меняет поколение списка. Правит список только тот,
+    кто взял блокировку; проигравший просто удаляет список. Если за время
+    правки поколение сменилось, держатель блокировки тоже удаляет список —
+    он соберётся заново при следующем чтении.
+    """
+    key = timeline_key(group_id)
+    seen = next_generation(key)
+    lock = f'{key}:lock'
+    if not cache.add(lock, True, LOCK_TIMEOUT):
+        cache.delete(key)
+        yield None
+        return
+    try:
+        timeline = cache.get(key)
+        yield timeline
+        if timeline is not None:
+            store(key, timeline, seen)
+    finally:
+        cache.delete(lock)
+
+
+def add_post(post, group_id=None):
+    with changing(group_id) as timeline:
+        if timeline is None:
+            return
+        entries = [
+            entry for entry in timeline['entries'] if entry[1] != post.pk
+        ]
+        entries.append((post.pub_date, post.pk))
+        entries.sort(reverse=True)
+        if len(entries) > TIMELINE_SIZE:
+            del entries[TIMELINE_SIZE:]
+            timeline['complete'] = False
+        elif not timeline['complete'] and entries[-1][1] == post.pk:
+            # Старый пост за пределами окна: его место знает только БД.
+            entries.pop()
+        timeline['entries'] = entries
+
+
+def remove_post(post_id, group_id=None):
+    with changing(group_id) as timeline:
+        if timeline is None:
+            return
+        timeline['entries'] = [
+            entry for entry in timeline['entries'] if entry[1] != post_id
+        ]
+
+
+def drop_timeline(group_id):
+    cache.delete(timeline_key(group_id))
+
+
+class TimelineFeed:
+    """
+    Лента по списку id из кэша: срез стоит одного запроса in_bulk.
+
+    Страницы за пределами списка читаются из queryset, как раньше.
+    Поддерживает count() и срезы, поэтому подходит для Paginator.
+    """
+
+    def __init__(self, queryset, group_id=None, count=None):
+        self.queryset = queryset
+        self.group_id = group_id
+        self.get_count = count
+
+    @cached_property
+    def timeline(self):
+        return load_timeline(self.group_id)
+
+    def count(self):
+        if self.timeline['complete']:
+            return len(self.timeline['entries'])
+        if self.get_count is not None:
+            return self.get_count()
+        return self.queryset.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        entries = self.timeline['entries']
+        if index.stop > len(entries) and not self.timeline['complete']:
+            return list(
+                self.queryset.order_by('-pub_date', '-pk')[start:index.stop]
+            )
+        ids = [pk for _, pk in entries[start:index.stop]]
+        if not ids:
+            return []
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
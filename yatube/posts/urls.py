@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 app_name = "posts"
 
@@ -9,6 +9,24 @@ urlpatterns = [
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('search/', views.search, name='search'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path('rss/', feeds.index_rss, name='index_rss'),
+    path('atom/', feeds.index_atom, name='index_atom'),
+    path('group/<slug:slug>/rss/', feeds.group_rss, name='group_rss'),
+    path('group/<slug:slug>/atom/', feeds.group_atom, name='group_atom'),
+    path(
+        'profile/<str:username>/rss/', feeds.author_rss, name='profile_rss'
+    ),
+    path(
+        'profile/<str:username>/atom/', feeds.author_atom,
+        name='profile_atom'
+    ),
+    path('api/posts/', api.post_list, name='api_post_list'),
+    path('api/posts/<int:post_id>/', api.post_detail, name='api_post_detail'),
+    path('api/group/<slug:slug>/', api.group_posts, name='api_group_list'),
+    path(
+        'api/profile/<str:username>/', api.profile_posts, name='api_profile'
+    ),
 ]
@@ -1,63 +1,146 @@
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404, redirect
+from django.utils.http import urlencode
 
+from .archive import ArchiveFeed, get_post_or_404
+from .cache import cache_anonymous_page, posts_count, set_card_versions
+from .conditions import (
+    conditional_page, group_state, post_state, profile_state
+)
 from .forms import PostForm
 from .models import Post, Group, User
+from .paginators import (
+    CountFreePaginator, CursorPaginator, elided_page_range
+)
+from .search import search_posts
+from .timelines import TimelineFeed
+from core.db import retry_on_lock
+from core.ratelimit import rate_limit
 from yatube.settings import POSTS_ON_PAGE
 
 
-def page_obj(queryset, request):
-    return Paginator(queryset, POSTS_ON_PAGE).get_page(request.GET.get('page'))
+def page_obj(posts, request, count=None):
+    cursor = request.GET.get('cursor')
+    if cursor is not None:
+        # Курсор идёт по индексу (pub_date, id) мимо списков TimelineFeed,
+        # а за горячей таблицей продолжается архивом.
+        page = CursorPaginator(
+            getattr(posts, 'queryset', posts), POSTS_ON_PAGE,
+            getattr(posts, 'archived', None)
+        ).page(cursor)
+    elif count is not None:
+        page = CountFreePaginator(posts, POSTS_ON_PAGE, count).get_page(
+            request.GET.get('page')
+        )
+    else:
+        page = Paginator(posts, POSTS_ON_PAGE).get_page(
+            request.GET.get('page')
+        )
+    if not getattr(page, 'is_cursor', False):
+        page.elided_page_range = elided_page_range(page)
+    set_card_versions(page)
+    return page
 
 
+def feed(queryset):
+    return queryset.select_related('author', 'group')
+
+
+def cards(queryset, *fields):
+    """Лента для шаблонов: текст уже размечен, полный text не читаем."""
+    return feed(queryset).defer('text', *fields)
+
+
+@cache_anonymous_page(lambda: 'index')
 def index(request):
+    posts = TimelineFeed(
+        cards(Post.objects.all(), 'excerpt_html'), count=posts_count
+    )
     return render(request, 'posts/index.html', {
-        'page_obj': page_obj(Post.objects.all(), request),
+        'page_obj': page_obj(posts, request, count=posts.count),
     })
 
 
+@conditional_page(group_state)
+@cache_anonymous_page(lambda slug: f'group:{slug}')
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     return render(request, 'posts/group_list.html', {
-        'page_obj': page_obj(group.posts.all(), request),
+        'page_obj': page_obj(ArchiveFeed(
+            TimelineFeed(
+                cards(group.posts.all(), 'excerpt_html'), group.pk,
+                count=lambda: group.posts_count
+            ),
+            cards(group.archived_posts.all(), 'excerpt_html'),
+            total=lambda: group.posts_count
+        ), request),
         'group': group,
     })
 
 
+@conditional_page(profile_state)
+@cache_anonymous_page(lambda username: f'profile:{username}')
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    stats = getattr(author, 'stats', None)
     return render(request, 'posts/profile.html', {
-        'page_obj': page_obj(author.posts.all(), request),
+        'page_obj': page_obj(ArchiveFeed(
+            cards(author.posts.all(), 'text_html'),
+            cards(author.archived_posts.all(), 'text_html'),
+            # Без счётчика ArchiveFeed посчитает обе таблицы сам.
+            total=(lambda: stats.posts_count) if stats else None
+        ), request),
         'author': author,
     })
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page = Paginator(
+        search_posts(query, cards(Post.objects.all(), 'text_html')),
+        POSTS_ON_PAGE
+    ).get_page(request.GET.get('page'))
+    page.elided_page_range = elided_page_range(page)
+    return render(request, 'posts/search.html', {
+        'page_obj': page,
+        'query': query,
+        'page_query': urlencode({'q': query}) + '&',
+    })
+
+
+@conditional_page(post_state)
 def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', {
-        'post': get_object_or_404(Post, pk=post_id),
+        'post': get_post_or_404(post_id, 'author__stats', 'group'),
     })
 
 
 @login_required
+@rate_limit('posts')
 def post_create(request):
-    form = PostForm(request.POST)
+    form = PostForm(request.POST, files=request.FILES or None)
     if not form.is_valid():
         return render(request, 'posts/create_post.html', {'form': form})
     post = form.save(commit=False)
     post.author = request.user
-    post.save()
+    retry_on_lock(post.save)()
     return redirect('posts:profile', username=post.author)
 
 
 @login_required
+@rate_limit('posts')
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    if post.author != request.user:
+    if post.author_id != request.user.pk:
         return redirect('posts:post_detail', post.pk)
-    form = PostForm(request.POST or None, instance=post)
+    form = PostForm(
+        request.POST or None, files=request.FILES or None, instance=post
+    )
     if form.is_valid():
-        form.save()
+        retry_on_lock(form.save)()
         return redirect('posts:post_detail', post_id=post.pk)
     return render(request, 'posts/create_post.html', {
         'form': form,
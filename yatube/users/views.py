@@ -1,9 +1,12 @@
 from django.views.generic import CreateView
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 
+from core.ratelimit import rate_limit
 from .forms import CreationForm
 
 
+@method_decorator(rate_limit('signup'), name='dispatch')
 class SignUp(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
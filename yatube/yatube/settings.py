@@ -50,11 +50,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -89,9 +91,93 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': 60,
+    },
+    # Копия основной базы только для чтения. Пока её файл совпадает
+    # с основным, ReplicaRouter читает из default.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get(
+            'YATUBE_REPLICA_DB', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+# Выполняются на каждом новом соединении с SQLite (core.db).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+# Повторы записи при «database is locked»: число и первая пауза, секунды.
+SQLITE_WRITE_RETRIES = 5
+SQLITE_RETRY_DELAY = 0.05
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Token bucket на запись: число запросов за период (s, m, h, d) на
+# пользователя и на IP; GET не ограничивается (core.ratelimit).
+RATE_LIMITS = {
+    'posts': {'user': '10/m', 'ip': '60/m'},
+    'signup': {'ip': '5/h'},
 }
 
+# Страницы, которые читают с реплики.
+REPLICA_VIEWS = [
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:search',
+    'posts:index_rss',
+    'posts:index_atom',
+    'posts:group_rss',
+    'posts:group_atom',
+    'posts:profile_rss',
+    'posts:profile_atom',
+    'posts:api_post_list',
+    'posts:api_post_detail',
+    'posts:api_group_list',
+    'posts:api_profile',
+]
+# Страницы, которые кэшируются для всех читателей, даже вошедших.
+SHARED_CACHE_VIEWS = [
+    'posts:index_rss',
+    'posts:index_atom',
+    'posts:group_rss',
+    'posts:group_atom',
+    'posts:profile_rss',
+    'posts:profile_atom',
+]
+# Сколько секунд после записи её автор, а после сброса кэша страниц —
+# все, кто его наполняет, читают из основной базы.
+REPLICA_PIN_SECONDS = 10
+
+# Версии и сбросы кэша страниц, ленты timelines, корзины RATE_LIMITS
+# и сведения sorl о миниатюрах должны быть общими для всех процессов,
+# а add/incr — атомарными: в боевом окружении нужен memcached
+# (YATUBE_MEMCACHED=host:port). LocMemCache живёт внутри одного процесса:
+# сброс из одного воркера не дойдёт до других, поэтому он только для
+# runserver и тестов.
+if os.environ.get('YATUBE_MEMCACHED'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': os.environ['YATUBE_MEMCACHED'].split(','),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            # По умолчанию 300 ключей: вытеснялись бы версии страниц.
+            'OPTIONS': {'MAX_ENTRIES': 100000},
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -132,11 +218,49 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Миниатюры режет пул потоков posts.thumbnails, а не отрисовка страницы.
+THUMBNAIL_BACKEND = 'posts.thumbnails.BackgroundThumbnailBackend'
+THUMBNAIL_KVSTORE = 'posts.thumbnails.CacheKVStore'
+THUMBNAIL_WORKERS = 2
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма копятся в очереди, отправляет их manage.py send_queued_mail.
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+MAIL_QUEUE_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Попыток до пометки «не отправлено» и первая пауза между ними, секунды.
+MAIL_QUEUE_RETRIES = 5
+MAIL_QUEUE_RETRY_DELAY = 60
+# Через сколько секунд письма упавшего воркера может взять другой.
+MAIL_QUEUE_LOCK_TIMEOUT = 600
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 POSTS_ON_PAGE = 10
+# Страницы лент для анонимов сбрасываются при записи, срок — лишь предел.
+PAGE_CACHE_TIMEOUT = 24 * 60 * 60
+# Сколько последних id постов держат в кэше ленты index и групп.
+TIMELINE_SIZE = 1000
+# Как часто фоновый поток пересчитывает число постов для пагинации index.
+POSTS_COUNT_TIMEOUT = 5 * 60
+
+# Заголовок Server-Timing и строки лога yatube.timing по каждому запросу.
+SERVER_TIMING = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yatube.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}